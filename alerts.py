@@ -0,0 +1,186 @@
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from metrics import metrics
+from signals import match_rules
+
+# Where alerts go, if anywhere: a JSON-lines file, a local webhook and/or desktop notifications
+ALERT_LOG_PATH = os.environ.get('ALERT_LOG_PATH')
+ALERT_WEBHOOK_URL = os.environ.get('ALERT_WEBHOOK_URL')
+ALERT_DESKTOP = os.environ.get('ALERT_DESKTOP', '0') == '1'
+# Alerts waiting for the sinks; past this, new ones are dropped rather than stalling the refresh job
+ALERT_QUEUE_SIZE = 1000
+
+# One setup that just fired: a sized rule of a strategy newly matching a symbol's 5-minute bar
+Alert = namedtuple('Alert', ['strategy', 'symbol', 'time', 'highlight', 'side', 'close', 'rsi', 'lower_band',
+                             'upper_band'])
+
+# Function to describe an alert in one line
+def alert_message(alert):
+    return (f'{alert.strategy} {alert.side} setup: {alert.symbol} at {alert.time:%Y-%m-%d %H:%M}, '
+            f'close {alert.close:.2f}, RSI {alert.rsi:.2f}, bands {alert.lower_band:.2f}-{alert.upper_band:.2f}')
+
+# Function to lay an alert out as JSON for the log file and webhook
+def alert_payload(alert):
+    return dict(alert._asdict(), time=alert.time.isoformat(), message=alert_message(alert))
+
+# Appends each alert as one JSON line
+class LogSink:
+    name = 'log'
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, alert):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(alert_payload(alert)) + '\n')
+
+# POSTs each alert as JSON, e.g. to a local bot or order-staging tool
+class WebhookSink:
+    name = 'webhook'
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, alert):
+        from curl_cffi import requests as curl_requests
+        curl_requests.post(self.url, json=alert_payload(alert), timeout=self.timeout).raise_for_status()
+
+# Shows each alert as a desktop notification through notify-send
+class DesktopSink:
+    name = 'desktop'
+
+    def __init__(self, command='notify-send'):
+        self.command = command
+
+    def send(self, alert):
+        subprocess.run([self.command, f'{alert.symbol} {alert.side} setup', alert_message(alert)],
+                       check=True, timeout=5)
+
+# Function to build the sinks the environment asks for
+def default_sinks():
+    sinks = []
+    if ALERT_LOG_PATH:
+        sinks.append(LogSink(ALERT_LOG_PATH))
+    if ALERT_WEBHOOK_URL:
+        sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+    if ALERT_DESKTOP and shutil.which('notify-send'):
+        sinks.append(DesktopSink())
+    return sinks
+
+# Hands alerts to the sinks on one background thread through a bounded queue, so a slow webhook or a
+# full disk never holds up the refresh job; a failing sink doesn't stop the others
+class AlertDispatcher:
+    def __init__(self, sinks=(), queue_size=ALERT_QUEUE_SIZE):
+        self.sinks = list(sinks)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.worker = None
+        self.lock = threading.Lock()
+
+    # Add a sink: anything with a name and a send(alert) method
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def submit(self, alert):
+        if not self.sinks:
+            return
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name='alerts', daemon=True)
+                self.worker.start()
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            metrics.count('alert_deliveries', sink='queue', result='dropped')
+
+    def run(self):
+        while True:
+            alert = self.queue.get()
+            for sink in list(self.sinks):
+                try:
+                    sink.send(alert)
+                    metrics.count('alert_deliveries', sink=sink.name, result='sent')
+                except Exception:
+                    metrics.count('alert_deliveries', sink=sink.name, result='error')
+            self.queue.task_done()
+
+    # Wait until every submitted alert has been through the sinks
+    def drain(self):
+        self.queue.join()
+
+# Evaluates strategies' sized rules on the bars each refresh added. Every symbol resumes from the last
+# bar it saw (which may have been revised since), and those bars of all symbols are matched in one
+# batch per strategy, so a cycle costs O(new bars x symbols). An alert fires when a bar starts matching
+# a rule the bar before it didn't; the last (bar, rule) fired per strategy and symbol is remembered so
+# a still-forming bar that is evaluated again doesn't fire twice. A symbol seen for the first time is
+# armed at its latest bar instead of replaying the session.
+class AlertEngine:
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher if dispatcher is not None else AlertDispatcher()
+        self.last_time = {}
+        self.fired = {}
+        self.lock = threading.Lock()
+
+    # Gather every symbol's bars from its last evaluated bar on, plus the bar before that as context, into
+    # one (field x bar) array. Returns (symbols, fields, times, values, owner, context), owner being the
+    # symbol position of each bar and context marking bars only there as "previous"; None if nothing is new.
+    def new_bars(self, market):
+        symbols, fields, times, values, owner, context = [], None, [], [], [], []
+        for ticker_symbol, bars in market.data_5min_all.items():
+            if bars.empty:
+                continue
+            last_time = self.last_time.get(ticker_symbol)
+            # A new session's bars all come after the last bar seen, so this also starts it from its first bar
+            start = len(bars) - 1 if last_time is None else int(np.searchsorted(bars.times, last_time))
+            self.last_time[ticker_symbol] = bars.times[-1]
+            if start == len(bars):
+                continue
+            first = max(start - 1, 0)
+            fields = bars.fields
+            owner.append(np.full(len(bars) - first, len(symbols)))
+            context.append(np.arange(first, len(bars)) < start)
+            symbols.append((ticker_symbol, bars.tz))
+            times.append(bars.times[first:])
+            values.append(bars.values[:, first:])
+        if not symbols:
+            return None
+        return (symbols, fields, np.concatenate(times), np.concatenate(values, axis=1), np.concatenate(owner),
+                np.concatenate(context))
+
+    def evaluate_strategy(self, strategy, symbols, fields, times, values, owner, context):
+        matched = match_rules({field: values[i] for i, field in enumerate(fields)}, strategy.rules)
+        previous = np.concatenate(([-1], matched[:-1]))
+        previous[np.flatnonzero(np.diff(owner)) + 1] = -1
+        sided = np.array([rule.side is not None for rule in strategy.rules] + [False])
+        alerts = []
+        for bar in np.flatnonzero(sided[matched] & (matched != previous) & ~context):
+            (ticker_symbol, tz), rule_index = symbols[owner[bar]], int(matched[bar])
+            key = (strategy.name, ticker_symbol)
+            if self.fired.get(key) == (times[bar], rule_index):
+                continue
+            self.fired[key] = (times[bar], rule_index)
+            rule, row = strategy.rules[rule_index], dict(zip(fields, values[:, bar].tolist()))
+            time = pd.Timestamp(int(times[bar]), tz='UTC').tz_convert(tz)
+            alerts.append(Alert(strategy.name, ticker_symbol, time, rule.highlight, rule.side, row['Close'],
+                                row['RSI'], row['LowerBand'], row['UpperBand']))
+        return alerts
+
+    # Evaluate every strategy on a market snapshot's new bars and queue what fired; returns the alerts
+    def evaluate(self, market, strategies):
+        alerts = []
+        with self.lock, metrics.timer('alerts'):
+            batch = self.new_bars(market)
+            if batch is not None:
+                for strategy in strategies:
+                    alerts += self.evaluate_strategy(strategy, *batch)
+        for alert in alerts:
+            metrics.count('alerts_fired', strategy=alert.strategy)
+            self.dispatcher.submit(alert)
+        return alerts
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from fetch_scheduler import FetchRequest, fetch_all
+from signals import evaluate_signals, position_sizing
+
+TRADE_COLUMNS = ['Symbol', 'EntryTime', 'Side', 'Entry', 'StopLoss', 'Target', 'Qty', 'ExitTime', 'Exit', 'Outcome', 'PnL']
+SUMMARY_COLUMNS = ['Trades', 'Targets', 'StopLosses', 'SessionCloses', 'HitRate', 'PnL', 'MaxDrawdown']
+
+# Function to give every bar the position of its session's first and one-past-last bar.
+# A session is one trading day of one symbol, so bars are stacked symbol after symbol.
+def session_bounds(index, symbol_ids):
+    days = index.normalize().asi8
+    new = np.ones(len(days), dtype=bool)
+    new[1:] = (days[1:] != days[:-1]) | (symbol_ids[1:] != symbol_ids[:-1])
+    positions = np.arange(len(days))
+    starts = np.maximum.accumulate(np.where(new, positions, 0))
+    last = np.append(new[1:], True)
+    ends = np.minimum.accumulate(np.where(last, positions + 1, len(days))[::-1])[::-1]
+    return starts, ends
+
+# Function to compute a rolling statistic over every bar, NaN until `window` bars of its session exist
+def session_rolling(values, starts, window, statistic):
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        result[window - 1:] = statistic(sliding_window_view(values, window))
+    result[np.arange(len(values)) - starts < window - 1] = np.nan
+    return result
+
+# Function to compute the page's 5-minute RSI and Bollinger Bands for every session at once.
+# Same definitions as calculate_5min_rsi_bollinger on one day of bars: indicators restart each
+# session and the first bar's missing change counts as no gain and no loss.
+def session_indicators(close, starts, rsi_window=23, bb_window=20, num_std_dev=2):
+    delta = np.diff(close, prepend=close[:1])
+    delta[starts == np.arange(len(close))] = 0.0
+    avg_gain = session_rolling(np.where(delta > 0, delta, 0.0), starts, rsi_window, lambda w: w.mean(axis=1))
+    avg_loss = session_rolling(np.where(delta < 0, -delta, 0.0), starts, rsi_window, lambda w: w.mean(axis=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    sma = session_rolling(close, starts, bb_window, lambda w: w.mean(axis=1))
+    std = session_rolling(close, starts, bb_window, lambda w: w.std(axis=1, ddof=1))
+    return rsi, sma + num_std_dev * std, sma - num_std_dev * std
+
+# Function to find where each entry exits. Every entry scans the rest of its session at once as one
+# row of an (entries x bars ahead) matrix: the first bar whose low/high reaches the stop-loss or the
+# target closes it (stop-loss first when one bar reaches both, gaps fill at the open), otherwise it
+# closes with the session. Returns exit bar positions, exit prices and outcomes.
+def simulate_exits(open_, high, low, close, ends, entries, is_long, stop_loss, target):
+    if not len(entries):
+        return entries, np.empty(0), np.empty(0, dtype=str)
+    horizon = int((ends[entries] - entries).max()) - 1
+    ahead = entries[:, None] + np.arange(1, horizon + 1)
+    in_session = ahead < ends[entries][:, None]
+    ahead = np.where(in_session, ahead, entries[:, None])
+    long_ = is_long[:, None]
+    stop_hit = in_session & np.where(long_, low[ahead] <= stop_loss[:, None], high[ahead] >= stop_loss[:, None])
+    target_hit = in_session & np.where(long_, high[ahead] >= target[:, None], low[ahead] <= target[:, None])
+    first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), horizon)
+    first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), horizon)
+
+    stopped = first_stop < horizon
+    stopped &= first_stop <= first_target
+    reached = ~stopped & (first_target < horizon)
+    exit_bar = np.where(stopped, first_stop, np.where(reached, first_target, 0))
+    exit_at = np.where(stopped | reached, entries + 1 + exit_bar, ends[entries] - 1)
+    gap_open = open_[exit_at]
+    stop_fill = np.where(is_long, np.minimum(gap_open, stop_loss), np.maximum(gap_open, stop_loss))
+    target_fill = np.where(is_long, np.maximum(gap_open, target), np.minimum(gap_open, target))
+    exit_price = np.where(stopped, stop_fill, np.where(reached, target_fill, close[exit_at]))
+    outcome = np.where(stopped, 'StopLoss', np.where(reached, 'Target', 'SessionClose'))
+    return exit_at, exit_price, outcome
+
+# Function to replay 5-minute history of many symbols through a strategy's rules and simulate every
+# sized entry. frames maps symbol -> OHLC bars (any number of sessions). Entries are taken at the
+# signal bar's close with the page's SL/Qty/Target; each flagged bar is an independent trade.
+def run_backtest(frames, rules, user_capital, user_risk, rsi_window=23, bb_window=20, num_std_dev=2):
+    frames = {symbol: data for symbol, data in frames.items() if len(data)}
+    if not frames:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    symbols = list(frames)
+    stacked = pd.concat(frames.values())
+    symbol_ids = np.repeat(np.arange(len(symbols)), [len(data) for data in frames.values()])
+    open_, high, low, close = (stacked[column].to_numpy(dtype=float) for column in ('Open', 'High', 'Low', 'Close'))
+    starts, ends = session_bounds(stacked.index, symbol_ids)
+    rsi, upper_band, lower_band = session_indicators(close, starts, rsi_window, bb_window, num_std_dev)
+
+    signal = evaluate_signals({'RSI': rsi, 'Close': close, 'LowerBand': lower_band, 'UpperBand': upper_band}, rules)
+    stop_loss, qty, target = position_sizing(close, signal, user_capital, user_risk, rules)
+    entries = np.flatnonzero((qty == qty) & (np.arange(len(close)) + 1 < ends))
+    is_long = np.isin(signal[entries], [rule.highlight for rule in rules if rule.side == 'long'])
+    exit_at, exit_price, outcome = simulate_exits(open_, high, low, close, ends, entries, is_long,
+                                                  stop_loss[entries], target[entries])
+    direction = np.where(is_long, 1.0, -1.0)
+    return pd.DataFrame({'Symbol': np.array(symbols, dtype=object)[symbol_ids[entries]],
+                         'EntryTime': stacked.index[entries], 'Side': np.where(is_long, 'long', 'short'),
+                         'Entry': close[entries], 'StopLoss': stop_loss[entries], 'Target': target[entries],
+                         'Qty': qty[entries], 'ExitTime': stacked.index[exit_at], 'Exit': exit_price,
+                         'Outcome': outcome, 'PnL': direction * qty[entries] * (exit_price - close[entries])},
+                        columns=TRADE_COLUMNS)
+
+# Function to summarise trades per symbol: hit rate (share of trades reaching target), total P&L and
+# the largest peak-to-trough fall of cumulative P&L in exit order
+def summarize_backtest(trades):
+    if trades.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS, index=pd.Index([], name='Symbol'))
+    trades = trades.sort_values(['Symbol', 'ExitTime', 'EntryTime'], kind='stable')
+    equity = trades.groupby('Symbol', sort=False)['PnL'].cumsum()
+    peak = equity.groupby(trades['Symbol'], sort=False).cummax().clip(lower=0)
+    outcomes = pd.crosstab(trades['Symbol'], trades['Outcome']).reindex(
+        columns=['Target', 'StopLoss', 'SessionClose'], fill_value=0)
+    grouped = trades.groupby('Symbol')
+    summary = pd.DataFrame({'Trades': grouped.size(), 'Targets': outcomes['Target'],
+                            'StopLosses': outcomes['StopLoss'], 'SessionCloses': outcomes['SessionClose'],
+                            'PnL': grouped['PnL'].sum(),
+                            'MaxDrawdown': (peak - equity).groupby(trades['Symbol']).max()})
+    summary['HitRate'] = summary['Targets'] / summary['Trades']
+    return summary[SUMMARY_COLUMNS].sort_values('PnL', ascending=False)
+
+# Function to backtest symbols over cached 5-minute history (yfinance keeps about 60 days of it)
+def backtest_symbols(ticker_symbols, rules, user_capital, user_risk, period='60d'):
+    bars = fetch_all([FetchRequest(ticker_symbol, '5m', period) for ticker_symbol in ticker_symbols],
+                     raise_errors=False)
+    frames = {request.symbol: data for request, data in bars.items() if data is not None and not data.empty}
+    trades = run_backtest(frames, rules, user_capital, user_risk)
+    return trades, summarize_backtest(trades)
@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+from metrics import metrics
+from data_sources import BAR_COLUMNS, INTRADAY_INTERVALS, YFinanceSource, period_offset, trim_to_period
+from market_client import ChartSource
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    'BAR_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'bars.sqlite'))
+
+# Provider behind the shared cache: 'chart' (pooled async client, see market_client) or 'yfinance'
+MARKET_DATA_SOURCE = os.environ.get('MARKET_DATA_SOURCE', 'chart')
+
+# How long a cached series is trusted before asking the source for newer bars (seconds)
+REFRESH_SECONDS = {'5m': 60, '1d': 15 * 60, '1wk': 60 * 60, '1mo': 60 * 60}
+
+# Function to convert a DatetimeIndex to int64 epoch nanoseconds (UTC)
+def to_epoch_ns(index):
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.to_numpy(dtype='datetime64[ns]').astype('int64')
+
+# Function to rank periods by the span of history they cover
+def period_span(period):
+    if period == 'max':
+        return float('inf')
+    offset = period_offset(period)
+    if offset is None:
+        return 0
+    return (pd.Timestamp('2000-01-01') + offset - pd.Timestamp('2000-01-01')).days
+
+# Function to give how far back from its last bar a series is kept for its period (ns), None for all of it.
+# Intraday 'Nd' periods are N sessions, so weekends and holidays get room on top of the N days.
+def retention_ns(period, interval):
+    span = period_span(period)
+    if span in (0, float('inf')):
+        return None
+    if interval in INTRADAY_INTERVALS and period.endswith('d'):
+        span = 2 * span
+    return (span + 7) * 24 * 60 * 60 * 10 ** 9
+
+# Function to tell whether a re-fetched final bar no longer matches the cached one, i.e. the provider
+# has rescaled its split/dividend-adjusted history since the series was cached
+def rescaled(cached, newer, anchor):
+    if newer.empty or newer.index[0] != anchor:
+        return False
+    return not np.isclose(newer['Close'].iloc[0], cached['Close'].loc[anchor], rtol=1e-9, atol=0)
+
+# SQLite store of OHLCV bars keyed by (symbol, interval); each series records the source it came from
+class BarStore:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute('CREATE TABLE IF NOT EXISTS bars (symbol TEXT, interval TEXT, ts INTEGER, '
+                         'open REAL, high REAL, low REAL, close REAL, volume REAL, '
+                         'PRIMARY KEY (symbol, interval, ts))')
+            conn.execute('CREATE TABLE IF NOT EXISTS series (symbol TEXT, interval TEXT, tz TEXT, '
+                         'period TEXT, fetched_at REAL, source TEXT, PRIMARY KEY (symbol, interval))')
+            # Caches written before sources were recorded: their series have source '' and are re-downloaded
+            if 'source' not in [column[1] for column in conn.execute('PRAGMA table_info(series)')]:
+                conn.execute("ALTER TABLE series ADD COLUMN source TEXT DEFAULT ''")
+            conn.commit()
+        finally:
+            conn.close()
+
+    # Return (bars, meta) for a series, or (None, None) if it was never cached
+    def load(self, symbol, interval):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            meta = conn.execute('SELECT tz, period, fetched_at, source FROM series WHERE symbol=? AND interval=?',
+                                (symbol, interval)).fetchone()
+            if meta is None:
+                return None, None
+            # Only the series' period back from its last bar, however long the cache has been refreshed
+            keep = retention_ns(meta[1], interval)
+            if keep is None:
+                rows = conn.execute('SELECT ts, open, high, low, close, volume FROM bars '
+                                    'WHERE symbol=? AND interval=? ORDER BY ts', (symbol, interval)).fetchall()
+            else:
+                rows = conn.execute('SELECT ts, open, high, low, close, volume FROM bars WHERE symbol=? AND '
+                                    'interval=? AND ts >= (SELECT MAX(ts) FROM bars WHERE symbol=? AND interval=?) - ? '
+                                    'ORDER BY ts', (symbol, interval, symbol, interval, keep)).fetchall()
+        finally:
+            conn.close()
+        tz, period, fetched_at, source = meta
+        data = pd.DataFrame(rows, columns=['ts'] + BAR_COLUMNS)
+        index = pd.to_datetime(data.pop('ts').to_numpy(), unit='ns', utc=True)
+        data.index = index.tz_convert(tz) if tz else index.tz_localize(None)
+        data.index.name = 'Datetime' if interval in INTRADAY_INTERVALS else 'Date'
+        return data, {'tz': tz, 'period': period, 'fetched_at': fetched_at, 'source': source or ''}
+
+    # Upsert bars for a series and mark it as fetched now from `source`; replace drops the series' old bars
+    # first, for a full download that must not be mixed with bars cached on another basis. Bars that fell
+    # out of the series' period are pruned.
+    def save(self, symbol, interval, data, period, source, replace=False):
+        tz = str(data.index.tz) if data.index.tz is not None else ''
+        rows = zip(to_epoch_ns(data.index).tolist(),
+                   *[data[column].astype(float).tolist() for column in BAR_COLUMNS])
+        with self.lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                if replace:
+                    conn.execute('DELETE FROM bars WHERE symbol=? AND interval=?', (symbol, interval))
+                conn.executemany('INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                 ((symbol, interval) + tuple(row) for row in rows))
+                keep = retention_ns(period, interval)
+                if keep is not None:
+                    conn.execute('DELETE FROM bars WHERE symbol=? AND interval=? AND ts < '
+                                 '(SELECT MAX(ts) FROM bars WHERE symbol=? AND interval=?) - ?',
+                                 (symbol, interval, symbol, interval, keep))
+                conn.execute('INSERT OR REPLACE INTO series (symbol, interval, tz, period, fetched_at, source) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', (symbol, interval, tz, period, time.time(), source))
+                conn.commit()
+            finally:
+                conn.close()
+
+# Function to create the configured default data source
+def default_source():
+    if MARKET_DATA_SOURCE == 'yfinance':
+        return YFinanceSource()
+    return ChartSource()
+
+# Read-through cache: serves bars from the store and only downloads what is new
+class BarCache:
+    def __init__(self, source=None, store=None):
+        self.source = source or default_source()
+        self.store = store or BarStore()
+
+    # Download a whole series and replace whatever was cached for it
+    def download(self, symbol, interval, period, timeout=None):
+        data = self.source.history(symbol, interval, period=period, timeout=timeout)
+        if data.empty:
+            return data
+        data = data[BAR_COLUMNS]
+        self.store.save(symbol, interval, data, period, self.source.name, replace=True)
+        return data
+
+    def get_bars(self, symbol, interval, period, timeout=None):
+        cached, meta = self.store.load(symbol, interval)
+        # Bars from another source (or an older cache) may be adjusted differently: download them again
+        if cached is None or cached.empty or period_span(meta['period']) < period_span(period) \
+                or meta['source'] != self.source.name:
+            metrics.count('bar_cache_requests', interval=interval, result='miss')
+            return trim_to_period(self.download(symbol, interval, period, timeout), period, interval)
+
+        if time.time() - meta['fetched_at'] < REFRESH_SECONDS.get(interval, 60):
+            metrics.count('bar_cache_requests', interval=interval, result='hit')
+        else:
+            # Re-fetch from the bar before the last cached one: the last may still be forming, the one
+            # before it is final, so it only changes when the provider rescaled its adjusted history
+            # after a split or dividend. Then every cached bar is on the old basis: download it all again.
+            anchor = cached.index[-2] if len(cached) > 1 else cached.index[-1]
+            newer = self.source.history(symbol, interval, start=anchor, timeout=timeout)
+            newer = newer[newer.index >= anchor][BAR_COLUMNS]
+            if len(cached) > 1 and rescaled(cached, newer, anchor):
+                metrics.count('bar_cache_requests', interval=interval, result='rescaled')
+                return trim_to_period(self.download(symbol, interval, meta['period'], timeout), period, interval)
+            metrics.count('bar_cache_requests', interval=interval, result='refresh')
+            self.store.save(symbol, interval, newer, meta['period'], self.source.name)
+            if not newer.empty:
+                if cached.index.tz is not None and newer.index.tz is not None:
+                    newer.index = newer.index.tz_convert(cached.index.tz)
+                cached = pd.concat([cached[cached.index < anchor], newer])
+        return trim_to_period(cached, period, interval)
+
+default_cache = None
+
+# Function to swap the data source and/or cache file, e.g. for a file-backed offline provider
+def configure(source=None, path=None):
+    global default_cache
+    default_cache = BarCache(source=source, store=BarStore(path or DEFAULT_CACHE_PATH))
+    return default_cache
+
+# Function to return the data source behind the shared cache
+def current_source():
+    if default_cache is None:
+        configure()
+    return default_cache.source
+
+# Function to fetch bars through the shared cache
+def get_bars(symbol, interval, period, timeout=None):
+    if default_cache is None:
+        configure()
+    return default_cache.get_bars(symbol, interval, period, timeout=timeout)
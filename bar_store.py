@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pandas as pd
+
+# The only 5-minute fields the pages, rules and push stream read; the rest of the frame is dropped
+STORE_FIELDS = ('Close', 'RSI', 'LowerBand', 'UpperBand')
+# Sessions of 5-minute history each symbol is fetched with (Yahoo serves 5-minute bars for ~60 days)
+INTRADAY_SESSIONS = int(os.environ.get('INTRADAY_SESSIONS', 1))
+# float32 halves the store; prices above ~10^5 then lose the second decimal, so float64 is the default
+STORE_DTYPE = np.dtype(os.environ.get('BAR_STORE_DTYPE', 'float64'))
+
+# Immutable compact bars of one symbol: int64 epoch-ns timestamps, one contiguous array per field and
+# an optional per-strategy signal stored as small integer codes. Reads like the few DataFrame bits the
+# pages use: len(bars), bars.index, bars['Close'].
+class CompactBars:
+    __slots__ = ('times', 'tz', 'fields', 'values', 'signal_codes', 'signal_labels', 'cached_index')
+
+    def __init__(self, times, tz, fields, values, signal_codes=None, signal_labels=()):
+        self.times = times
+        self.tz = tz
+        self.fields = fields
+        self.values = values
+        self.signal_codes = signal_codes
+        self.signal_labels = np.asarray(signal_labels, dtype=str)
+        self.cached_index = None
+        for array in (times, values, signal_codes):
+            if array is not None:
+                array.setflags(write=False)
+
+    @classmethod
+    def from_frame(cls, frame, fields=STORE_FIELDS, dtype=STORE_DTYPE):
+        values = np.empty((len(fields), len(frame)), dtype=dtype)
+        for i, field in enumerate(fields):
+            values[i] = frame[field].to_numpy(dtype=float)
+        return cls(frame.index.as_unit('ns').asi8.copy(), frame.index.tz, tuple(fields), values)
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def empty(self):
+        return not len(self.times)
+
+    @property
+    def index(self):
+        if self.cached_index is None:
+            index = pd.DatetimeIndex(self.times.view('datetime64[ns]'))
+            self.cached_index = index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+        return self.cached_index
+
+    def __getitem__(self, name):
+        if name == 'Signal':
+            if self.signal_codes is None:
+                return np.full(len(self.times), '')
+            return self.signal_labels[self.signal_codes]
+        return self.values[self.fields.index(name)]
+
+    # A view of the same bars flagged with a strategy's signals; the numeric arrays are shared, not copied
+    def with_signal(self, signal):
+        labels, codes = np.unique(np.asarray(signal, dtype=str), return_inverse=True)
+        return CompactBars(self.times, self.tz, self.fields, self.values, codes.astype(np.int8), labels)
+
+    # Pickled as its constructor arguments (see snapshot.save_snapshot); the index is rebuilt on demand
+    def __reduce__(self):
+        return CompactBars, (self.times, self.tz, self.fields, self.values, self.signal_codes, self.signal_labels)
+
+    # The bars at positions start to stop; the arrays are views, not copies
+    def slice(self, start, stop):
+        return CompactBars(self.times[start:stop], self.tz, self.fields, self.values[:, start:stop],
+                           None if self.signal_codes is None else self.signal_codes[start:stop], self.signal_labels)
+
+    # The first n bars
+    def head(self, n):
+        return self.slice(0, n)
+
+    # Fields at the given timestamps as a dict of arrays: NaN (and '' for Signal) where there is no bar,
+    # or a KeyError like DataFrame.loc when strict
+    def align(self, timestamps, strict=False):
+        wanted = pd.DatetimeIndex(timestamps).as_unit('ns').asi8
+        positions = np.minimum(np.searchsorted(self.times, wanted), max(len(self.times) - 1, 0))
+        found = (self.times[positions] == wanted) if len(self.times) else np.zeros(len(wanted), dtype=bool)
+        if strict and not found.all():
+            raise KeyError(f'{int((~found).sum())} timestamps not in bars')
+        aligned = {}
+        for i, field in enumerate(self.fields):
+            aligned[field] = np.where(found, self.values[i][positions] if len(self.times) else np.nan, np.nan)
+        aligned['Signal'] = np.where(found, self['Signal'][positions] if len(self.times) else '', '')
+        return aligned
+
+    @property
+    def nbytes(self):
+        codes = 0 if self.signal_codes is None else self.signal_codes.nbytes
+        return self.times.nbytes + self.values.nbytes + codes + self.signal_labels.nbytes
@@ -0,0 +1,67 @@
+# Backtest throughput: synthetic multi-session 5-minute history for many symbols replayed through the
+# buy and sell rules, checked trade for trade against a per-bar Python loop on a small universe.
+# Run from the repository root: python -m benchmarks.bench_backtest
+import time
+import numpy as np
+from benchmarks.fixtures import SESSION_BARS, synthetic_bars
+from backtest import run_backtest, summarize_backtest
+from indicators import calculate_5min_rsi_bollinger
+from signals import Rule, Strategy, evaluate_signals, position_sizing
+
+USER_CAPITAL = 2000000
+USER_RISK = 7000
+STRATEGIES = [Strategy('buy', (Rule('highlight-low', side='long', rsi_op='<=', rsi_threshold=45, band='below_lower'),
+                               Rule('highlight-high', side=None, rsi_op='>', rsi_threshold=85))),
+              Strategy('sell', (Rule('highlight-low', side='long', rsi_op='<=', rsi_threshold=20, band='below_lower'),
+                                Rule('highlight-high', side='short', rsi_op='>', rsi_threshold=60)))]
+
+def frames_for(symbol_count, sessions):
+    return {f'SYM{i}.NS': synthetic_bars(f'SYM{i}.NS', '5m', SESSION_BARS * sessions) for i in range(symbol_count)}
+
+# Reference: indicators per day with the page's pandas functions, then walk every trade bar by bar
+def loop_backtest(frames, rules):
+    trades = []
+    for symbol, data in frames.items():
+        for _, day in data.groupby(data.index.normalize()):
+            day = calculate_5min_rsi_bollinger(day.copy())
+            signal = evaluate_signals(day, rules)
+            close = day['Close'].to_numpy()
+            stop_loss, qty, target = position_sizing(close, signal, USER_CAPITAL, USER_RISK, rules)
+            longs = [rule.highlight for rule in rules if rule.side == 'long']
+            for i in range(len(day) - 1):
+                if qty[i] != qty[i]:
+                    continue
+                is_long = signal[i] in longs
+                exit_price, outcome = close[-1], 'SessionClose'
+                for j in range(i + 1, len(day)):
+                    bar = day.iloc[j]
+                    if (bar['Low'] <= stop_loss[i]) if is_long else (bar['High'] >= stop_loss[i]):
+                        exit_price = min(bar['Open'], stop_loss[i]) if is_long else max(bar['Open'], stop_loss[i])
+                        outcome = 'StopLoss'
+                        break
+                    if (bar['High'] >= target[i]) if is_long else (bar['Low'] <= target[i]):
+                        exit_price = max(bar['Open'], target[i]) if is_long else min(bar['Open'], target[i])
+                        outcome = 'Target'
+                        break
+                trades.append((symbol, outcome, (1 if is_long else -1) * qty[i] * (exit_price - close[i])))
+    return trades
+
+if __name__ == '__main__':
+    frames = frames_for(20, 5)
+    for strategy in STRATEGIES:
+        trades = run_backtest(frames, strategy.rules, USER_CAPITAL, USER_RISK)
+        reference = loop_backtest(frames, strategy.rules)
+        assert list(zip(trades['Symbol'], trades['Outcome'])) == [(s, o) for s, o, _ in reference]
+        assert np.allclose(trades['PnL'].to_numpy(), [p for _, _, p in reference], rtol=1e-9, atol=1e-6)
+        print(f'{strategy.name}: {len(trades)} trades match the bar-by-bar loop')
+
+    for symbol_count, sessions in ((100, 20), (500, 20), (500, 60)):
+        frames = frames_for(symbol_count, sessions)
+        for strategy in STRATEGIES:
+            start = time.perf_counter()
+            trades = run_backtest(frames, strategy.rules, USER_CAPITAL, USER_RISK)
+            summary = summarize_backtest(trades)
+            elapsed = time.perf_counter() - start
+            print(f'{strategy.name:<4} {symbol_count:>4} symbols x {sessions:>2} sessions | {len(trades):>6} trades '
+                  f'| {elapsed:6.2f} s | {symbol_count * sessions / elapsed:8.0f} symbol-days/s '
+                  f'| hit rate {summary["Targets"].sum() / max(summary["Trades"].sum(), 1):.2f}')
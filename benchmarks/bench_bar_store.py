@@ -0,0 +1,80 @@
+# Memory per symbol of the intraday snapshot: the indicator DataFrame it used to keep vs compact
+# columnar bars (float64 and float32), and the total a refresh retains per symbol (the market bars plus
+# every strategy's signal view of them), plus a tolerance check that float32 storage leaves indicators,
+# signals and displayed values within rounding of the float64 results.
+# Run from the repository root: python -m benchmarks.bench_bar_store
+import gc
+import tracemalloc
+import numpy as np
+from bar_store import CompactBars
+from benchmarks.fixtures import SESSION_BARS, synthetic_bars
+from buy_entry import STRATEGY
+from sell_entry import STRATEGY as SELL_STRATEGY
+from indicators import calculate_5min_rsi_bollinger
+from signals import evaluate_signals
+
+SYMBOLS = 500
+
+def session_frames():
+    return {symbol: calculate_5min_rsi_bollinger(synthetic_bars(symbol, '5m', SESSION_BARS)).dropna(subset=['RSI', 'LowerBand'])
+            for symbol in (f'SYM{i:04d}.NS' for i in range(SYMBOLS))}
+
+# Function to measure bytes retained by what build() returns, per symbol
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / SYMBOLS
+
+# Function to build what a refresh keeps per symbol: the market's compact bars and each strategy's view,
+# which shares the market arrays and adds only its signal codes
+def snapshot_bars(frames, dtype, strategies):
+    market = {s: CompactBars.from_frame(data, dtype=dtype) for s, data in frames.items()}
+    return market, [{s: bars.with_signal(evaluate_signals(bars, strategy.rules)) for s, bars in market.items()}
+                    for strategy in strategies]
+
+if __name__ == '__main__':
+    frames = session_frames()
+    rules = STRATEGY.rules
+    legacy = retained(lambda: {s: data.assign(Signal=evaluate_signals(data, rules)) for s, data in frames.items()})
+    print(f'{SYMBOLS} symbols, one session of 5-minute bars each ({len(next(iter(frames.values())))} bars with indicators)')
+    print(f'{"DataFrame with Signal column (before)":<42} | {legacy:9.0f} B/symbol')
+    for dtype in (np.float64, np.float32):
+        compact = retained(lambda: {s: CompactBars.from_frame(data, dtype=dtype).with_signal(evaluate_signals(data, rules))
+                                    for s, data in frames.items()})
+        print(f'{"compact bars, " + np.dtype(dtype).name:<42} | {compact:9.0f} B/symbol | {legacy / compact:5.1f}x smaller')
+    for dtype in (np.float64, np.float32):
+        total = retained(lambda: snapshot_bars(frames, dtype, (STRATEGY, SELL_STRATEGY)))
+        print(f'{"snapshot total, buy + sell, " + np.dtype(dtype).name:<42} | {total:9.0f} B/symbol | '
+              f'{legacy / total:5.1f}x smaller')
+
+    # float32 tolerance: stored indicators, indicators recomputed from stored closes, signals, display
+    worst = {'RSI': 0.0, 'LowerBand': 0.0, 'UpperBand': 0.0}
+    flips = display = 0
+    for s, data in frames.items():
+        bars32 = CompactBars.from_frame(data, dtype=np.float32)
+        for field in worst:
+            worst[field] = max(worst[field], float(np.max(np.abs(bars32[field] - data[field].to_numpy()))))
+        raw = synthetic_bars(s, '5m', SESSION_BARS).copy()
+        rounded = calculate_5min_rsi_bollinger(raw.assign(Close=raw['Close'].astype(np.float32).astype(float)))
+        recomputed = rounded['RSI'].reindex(data.index).to_numpy()
+        worst['RSI'] = max(worst['RSI'], float(np.max(np.abs(recomputed - data['RSI'].to_numpy()))))
+        flips += int((evaluate_signals(bars32, rules) != evaluate_signals(data, rules)).sum())
+        # Quotes are on 0.05 ticks, which float32 keeps to the displayed two decimals
+        ticks = np.round(data['Close'].to_numpy() / 0.05) * 0.05
+        display += sum(a != b for a, b in zip(['%.2f' % v for v in ticks.astype(np.float32).astype(float).tolist()],
+                                               ['%.2f' % v for v in ticks.tolist()]))
+    print(f'float32 max abs error | RSI {worst["RSI"]:.2e} | LowerBand {worst["LowerBand"]:.2e} '
+          f'| UpperBand {worst["UpperBand"]:.2e} | signal flips {flips} | price cells changed {display}')
+    assert worst['RSI'] < 1e-3
+    assert worst['LowerBand'] < 1e-3 and worst['UpperBand'] < 1e-3
+    assert flips == 0 and display == 0
+
+    # Compact float64 bars hold the frame's values exactly
+    data = next(iter(frames.values()))
+    bars = CompactBars.from_frame(data)
+    assert all(np.array_equal(bars[f], data[f].to_numpy()) for f in bars.fields) and bars.index.equals(data.index)
+    print('ok')
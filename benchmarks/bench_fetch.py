@@ -0,0 +1,38 @@
+# Sequential vs concurrent page fetch against a latency-injecting stub provider.
+# Run from the repository root: python -m benchmarks.bench_fetch
+import os
+import tempfile
+import time
+import zlib
+import bar_cache
+from benchmarks.fixtures import LatencySource
+from fetch_scheduler import FetchScheduler, page_requests
+
+# Function to give every (symbol, interval) a fixed latency between 50 and 300 ms
+def latency(symbol, interval):
+    return 0.05 + (zlib.crc32(f'{symbol}/{interval}'.encode()) % 250) / 1000
+
+def run(ticker_count):
+    symbols = [f'SYM{i}.NS' for i in range(ticker_count)]
+    requests = [request for symbol in symbols for request in page_requests(symbol)]
+    latencies = [latency(request.symbol, request.interval) for request in requests]
+
+    with tempfile.TemporaryDirectory() as directory:
+        bar_cache.configure(source=LatencySource(latency), path=os.path.join(directory, 'seq.sqlite'))
+        start = time.perf_counter()
+        for request in requests:
+            bar_cache.get_bars(request.symbol, request.interval, request.period)
+        sequential = time.perf_counter() - start
+
+        bar_cache.configure(source=LatencySource(latency), path=os.path.join(directory, 'pool.sqlite'))
+        scheduler = FetchScheduler(max_workers=64, default_limit=64)
+        start = time.perf_counter()
+        scheduler.fetch_all(requests)
+        concurrent = time.perf_counter() - start
+
+    print(f'{ticker_count:>4} tickers {len(requests):>4} requests | sum latency {sum(latencies):6.2f}s '
+          f'max latency {max(latencies):5.2f}s | sequential {sequential:6.2f}s concurrent {concurrent:5.2f}s')
+
+if __name__ == '__main__':
+    for ticker_count in (1, 3, 10, 25):
+        run(ticker_count)
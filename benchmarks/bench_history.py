@@ -0,0 +1,77 @@
+# Serving the RSI table with several sessions of 5-minute history loaded: rendering every row into the
+# page (before) vs only the latest window, with earlier rows fetched a page at a time from /rows (after).
+# Render time and payload of the windowed page should stay flat from 1 to 30 sessions. Checks the
+# window is the tail of the full table and that paging back through /rows rebuilds the whole table.
+# Run from the repository root: python -m benchmarks.bench_history
+import json
+import re
+import timeit
+from benchmarks.fixtures import SESSION_BARS, synthetic_bars
+from bar_store import CompactBars
+from buy_entry import PAGE, STRATEGY, app
+from indicators import calculate_5min_rsi_bollinger
+from live import history_rows, parse_after, table_rows, table_values
+from page import PAGE_ROWS, page_context, render_page
+from panel import session_index
+from signals import evaluate_signals
+from snapshot import make_snapshot
+
+USER_CAPITAL = 2000000
+USER_RISK = 7000
+TICKER_SYMBOLS = ['DIVISLAB.NS', 'HDFCBANK.NS', 'DRREDDY.NS']
+SESSIONS = [1, 5, 30]
+
+def best(function, number=5):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+# Function to build a strategy snapshot holding some sessions of flagged 5-minute bars
+def history_snapshot(sessions):
+    bars = {}
+    for ticker_symbol in TICKER_SYMBOLS:
+        data = calculate_5min_rsi_bollinger(synthetic_bars(ticker_symbol, '5m', SESSION_BARS * sessions))
+        data = data.dropna(subset=['RSI', 'LowerBand'])
+        bars[ticker_symbol] = CompactBars.from_frame(data).with_signal(evaluate_signals(data, STRATEGY.rules))
+    return make_snapshot(TICKER_SYMBOLS, bars, {t: (50.0, 50.0, 50.0) for t in TICKER_SYMBOLS})
+
+# Function to render the page with at most page_rows table rows
+def render(snapshot, page_rows):
+    return render_page(page_context(snapshot, PAGE, STRATEGY.rules, TICKER_SYMBOLS, USER_CAPITAL, USER_RISK,
+                                    page_rows=page_rows))
+
+# Function to lay out the /rows page before a time (None: the latest)
+def window_rows(snapshot, before=None):
+    return history_rows(snapshot, TICKER_SYMBOLS, USER_CAPITAL, USER_RISK, STRATEGY.rules, before)
+
+# Function to page back through /rows from the latest window to the first bar
+def all_pages(snapshot):
+    rows, before = [], None
+    while True:
+        page, before = window_rows(snapshot, parse_after(before))
+        rows = page + rows
+        if before is None:
+            return rows
+
+def table_body(html):
+    return re.findall(r'<tr data-time=.*?</tr>', html, re.S)
+
+if __name__ == '__main__':
+    print(f'{len(TICKER_SYMBOLS)} symbols, {PAGE_ROWS} rows per window')
+    print(f'{"sessions":>8} {"rows":>5} | {"full page":>10} {"bytes":>9} | {"window":>9} {"bytes":>8} | '
+          f'{"/rows page":>10} {"bytes":>7}')
+    with app.test_request_context('/'):
+        for sessions in SESSIONS:
+            snapshot = history_snapshot(sessions)
+            total = len(session_index(snapshot.data_5min_all, TICKER_SYMBOLS))
+            full, window = render(snapshot, total), render(snapshot, PAGE_ROWS)
+            assert table_body(window) == table_body(full)[-PAGE_ROWS:]
+            assert all_pages(snapshot) == table_rows(table_values(
+                snapshot, TICKER_SYMBOLS, session_index(snapshot.data_5min_all, TICKER_SYMBOLS)),
+                USER_CAPITAL, USER_RISK, STRATEGY.rules)
+
+            # A page from the middle of the history, as the browser asks for it while scrolling back
+            index = snapshot.data_5min_all[TICKER_SYMBOLS[0]].index
+            before = index[len(index) // 2]
+            page = json.dumps({'rows': window_rows(snapshot, before)[0]}, separators=(',', ':'))
+            print(f'{sessions:8d} {total:5d} | {best(lambda: render(snapshot, total)) * 1e3:8.2f}ms {len(full):9d} | '
+                  f'{best(lambda: render(snapshot, PAGE_ROWS)) * 1e3:7.2f}ms {len(window):8d} | '
+                  f'{best(lambda: window_rows(snapshot, before)) * 1e3:8.2f}ms {len(page):7d}')
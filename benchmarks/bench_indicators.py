@@ -0,0 +1,87 @@
+# Full pandas recompute vs the incremental engine: one bar through IncrementalIndicators, and a refresh
+# through update_indicators as the app calls it (the whole frame passed in, its last bar revised), plus
+# agreement with the pandas results: within TOLERANCE on whole frames up to the 60 sessions of 5-minute
+# bars the provider serves, and at every step while bars are appended one at a time and the forming bar
+# is revised (the engine's resume/revert path).
+# Run from the repository root: python -m benchmarks.bench_indicators
+import timeit
+import numpy as np
+from benchmarks.fixtures import synthetic_bars
+from indicators import (INDICATOR_COLUMNS, IncrementalIndicators, IndicatorEngine, calculate_5min_rsi_bollinger,
+                        calculate_bollinger_bands, calculate_rsi, update_indicators)
+
+TOLERANCE = 1e-9
+# Longest frame the tolerance is asserted on (60 sessions); beyond it pandas' rolling variance drifts
+MAX_CHECKED_BARS = 75 * 60
+# Bars appended one at a time in the step check
+STEP_BARS = 375
+
+def pandas_indicators(data):
+    data = calculate_bollinger_bands(data.copy())
+    data['RSI'] = calculate_rsi(data)
+    return data
+
+# Function to compare engine output with pandas: NaN positions must match exactly.
+# The engine's StdDev is an exact two-pass sum, so what remains is mostly pandas' own rolling-variance drift.
+def max_difference(result, expected):
+    worst_abs = worst_rel = 0.0
+    for column in INDICATOR_COLUMNS:
+        actual, reference = result[column].to_numpy(), expected[column].to_numpy()
+        assert (np.isnan(actual) == np.isnan(reference)).all(), column
+        valid = ~np.isnan(reference)
+        error = np.abs(actual[valid] - reference[valid])
+        if error.size:
+            worst_abs = max(worst_abs, error.max())
+            worst_rel = max(worst_rel, (error / np.maximum(np.abs(reference[valid]), 1e-12)).max())
+    return worst_abs, worst_rel
+
+def run(bars):
+    data = synthetic_bars('BENCH.NS', '5m', bars)
+    full = min(timeit.repeat(lambda: pandas_indicators(data), number=10, repeat=3)) / 10
+
+    indicators = IncrementalIndicators()
+    for close in data['Close'].iloc[:-1].tolist():
+        indicators.update(close)
+    last_close = data['Close'].iloc[-1]
+
+    def append_bar():
+        indicators.update(last_close)
+        indicators.revert()
+    per_bar = min(timeit.repeat(append_bar, number=1000, repeat=3)) / 1000
+
+    # A refresh as build_market makes it: the same symbol's frame again with the forming bar's close changed
+    revised = data.copy()
+    revised.iloc[-1, revised.columns.get_loc('Close')] *= 1.001
+    frames = [data, revised]
+    update_indicators('BENCH.NS', data)
+
+    def refresh_bar():
+        frames.reverse()
+        update_indicators('BENCH.NS', frames[0])
+    refresh = min(timeit.repeat(refresh_bar, number=20, repeat=3)) / 20
+
+    worst_abs, worst_rel = max_difference(IndicatorEngine().update('BENCH.NS', data), pandas_indicators(data))
+    if bars <= MAX_CHECKED_BARS:
+        assert worst_abs <= TOLERANCE, f'{bars} bars: max abs diff {worst_abs:.1e}'
+    print(f'{bars:>6} bars | pandas full recompute {full * 1e3:8.3f} ms | incremental bar {per_bar * 1e6:6.1f} us '
+          f'| update_indicators refresh {refresh * 1e3:7.3f} ms | max abs diff {worst_abs:.1e} rel {worst_rel:.1e}{"" if bars <= MAX_CHECKED_BARS else " (not asserted)"}')
+
+# Function to feed one engine frames growing a bar at a time, each first with the forming bar's close
+# revised and then final, as refreshes do; every result must match a pandas recompute of the same frame
+def step_check(bars):
+    data = synthetic_bars('STEP.NS', '5m', bars)
+    engine = IndicatorEngine()
+    worst = 0.0
+    for end in range(1, bars + 1):
+        forming = data.iloc[:end].copy()
+        forming.iloc[-1, forming.columns.get_loc('Close')] *= 1.001
+        for frame in (forming, data.iloc[:end]):
+            result = engine.update('STEP.NS', frame)
+            worst = max(worst, max_difference(result, calculate_5min_rsi_bollinger(frame.copy()))[0])
+    assert worst <= TOLERANCE, f'step check: max abs diff {worst:.1e}'
+    return worst
+
+if __name__ == '__main__':
+    for bars in (75, 375, 2250, 4500, 45000):
+        run(bars)
+    print(f'{STEP_BARS} bars appended one at a time with revisions | max abs diff {step_check(STEP_BARS):.1e}')
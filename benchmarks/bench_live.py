@@ -0,0 +1,124 @@
+# Load test for the /stream push endpoint: hundreds of SSE clients on one process, fed by a local
+# fake bar feed that releases one 5-minute bar per step. Reports fan-out latency per new bar and the
+# size of a pushed delta against a full page reload.
+# Run from the repository root: python -m benchmarks.bench_live [clients]
+import logging
+import os
+import resource
+import selectors
+import socket
+import sys
+import tempfile
+import threading
+import time
+import bar_cache
+from benchmarks.fixtures import SyntheticSource
+
+bar_cache.configure(source=SyntheticSource(), path=os.path.join(tempfile.mkdtemp(), 'bars.sqlite'))
+
+import buy_entry
+from live import bar_update
+from strategy_engine import engine
+from snapshot import make_snapshot
+from werkzeug.serving import make_server
+
+CLIENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+STEPS = 10
+
+# Fake bar feed: the day's snapshot cut off after `bars` bars
+class BarFeed:
+    def __init__(self, ticker_symbols):
+        self.full = buy_entry.build_snapshot(ticker_symbols)
+        self.ticker_symbols = ticker_symbols
+
+    def snapshot(self, bars):
+        return make_snapshot(self.ticker_symbols,
+                             {t: data.head(bars) for t, data in self.full.data_5min_all.items()},
+                             self.full.rsi_levels)
+
+    def publish(self, bars):
+        snapshots, updates = engine.snapshots['buy'], engine.updates['buy']
+        previous = snapshots.get()
+        snapshot = snapshots.swap(self.snapshot(bars))
+        updates.publish(bar_update(previous, snapshot))
+
+# Raw-socket SSE clients read by one selector thread, counting 'bars' events and their arrival times
+class Clients:
+    def __init__(self, port, count, after):
+        self.selector = selectors.DefaultSelector()
+        self.events = [0] * count
+        self.arrived = [[] for _ in range(count)]
+        self.bytes = [0] * count
+        request = f'GET /stream?after={after} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n'.encode()
+        for i in range(count):
+            sock = socket.create_connection(('127.0.0.1', port))
+            sock.sendall(request)
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ, i)
+        self.running = True
+        self.thread = threading.Thread(target=self.read, daemon=True)
+        self.thread.start()
+
+    def read(self):
+        while self.running:
+            for key, _ in self.selector.select(timeout=0.1):
+                chunk = key.fileobj.recv(65536)
+                if chunk:
+                    now = time.perf_counter()
+                    i = key.data
+                    self.bytes[i] += len(chunk)
+                    for _ in range(chunk.count(b'event: bars')):
+                        self.events[i] += 1
+                        self.arrived[i].append(now)
+
+    def wait_for(self, events, timeout=60):
+        deadline = time.perf_counter() + timeout
+        while min(self.events) < events and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        return min(self.events) >= events
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+
+if __name__ == '__main__':
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    ticker_symbols = buy_entry.DEFAULT_SETTINGS['ticker_symbols']
+    feed = BarFeed(ticker_symbols)
+    total_bars = len(feed.full.data_5min_all[ticker_symbols[0]])
+    first = total_bars - STEPS
+    engine.snapshots['buy'].swap(feed.snapshot(first))
+
+    server = make_server('127.0.0.1', 0, buy_entry.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with buy_entry.app.test_client() as client:
+        page_bytes = len(client.get('/').get_data())
+
+    start = time.perf_counter()
+    after = int(feed.full.data_5min_all[ticker_symbols[0]].index[first - 1].timestamp())
+    clients = Clients(server.port, CLIENTS, after)
+    connected = clients.wait_for(1)
+    print(f'{CLIENTS} clients connected and caught up in {time.perf_counter() - start:.2f} s '
+          f'({engine.updates["buy"].client_count()} streams open, all caught up: {connected})')
+
+    latencies = []
+    for step in range(1, STEPS + 1):
+        published = time.perf_counter()
+        feed.publish(first + step)
+        if not clients.wait_for(step + 1):
+            print(f'step {step}: not every client received the update')
+            break
+        arrivals = sorted(times[step] - published for times in clients.arrived)
+        latencies.append((arrivals[len(arrivals) // 2], arrivals[-1]))
+        time.sleep(0.05)
+
+    for step, (median, worst) in enumerate(latencies, 1):
+        print(f'bar {step:2d}: fan-out to {CLIENTS} clients | median {median * 1e3:7.2f} ms | last {worst * 1e3:7.2f} ms')
+    delta_bytes = (sum(clients.bytes) / CLIENTS) / (STEPS + 1)
+    print(f'pushed delta ~{delta_bytes:.0f} bytes per client per bar vs full page reload {page_bytes} bytes '
+          f'({page_bytes / delta_bytes:.0f}x smaller)')
+    print(f'peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB')
+    clients.close()
+    server.shutdown()
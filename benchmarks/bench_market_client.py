@@ -0,0 +1,79 @@
+# Market-data downloads against the local chart stand-in server: a fresh connection per request (as
+# when every call builds its own client) vs the pooled async client, plus single-flight and the rate
+# limiter, and agreement of the parsed bars with the synthetic fixture.
+# Run from the repository root: python -m benchmarks.bench_market_client
+import asyncio
+import time
+import pandas as pd
+from curl_cffi import requests as curl_requests
+from benchmarks.chart_server import start_chart_server
+from benchmarks.fixtures import SyntheticSource
+from fetch_scheduler import FetchRequest, FetchScheduler, page_requests
+from market_client import ChartSource, MarketDataClient, parse_chart
+
+LATENCY = 0.02
+SYMBOLS = [f'SYM{i:03d}.NS' for i in range(100)]
+
+# Function to download every request on the scheduler's threads, returning (seconds, connections opened)
+def timed_fetch(server, fetch, requests):
+    connections = server.connections
+    start = time.perf_counter()
+    results = FetchScheduler(max_workers=16, source_limits={}, default_limit=16, fetch=fetch).fetch_all(requests)
+    return results, time.perf_counter() - start, server.connections - connections
+
+def check_bars(source):
+    reference = SyntheticSource()
+    for request in [FetchRequest('AAA.NS', '5m', '1d'), FetchRequest('AAA.NS', '1d', 'max'),
+                    FetchRequest('AAA.NS', '1wk', '5y')]:
+        actual = source.history(request.symbol, request.interval, period=request.period)
+        expected = reference.history(request.symbol, request.interval, period=request.period)
+        pd.testing.assert_frame_equal(actual, expected, check_freq=False, check_names=False,
+                                      check_index_type=False)
+    expected = reference.history('AAA.NS', '5m', period='5d')
+    since = source.history('AAA.NS', '5m', start=expected.index[-10])
+    pd.testing.assert_frame_equal(since, expected.iloc[-10:], check_freq=False, check_names=False,
+                                  check_index_type=False)
+    assert source.history('INVALID.NS', '1d', period='max').empty
+
+if __name__ == '__main__':
+    server = start_chart_server(LATENCY)
+    requests = [request for symbol in SYMBOLS for request in page_requests(symbol)]
+
+    def fresh_connection(symbol, interval, period, timeout=None):
+        params = {'interval': interval, 'range': period}
+        response = curl_requests.get(f'{server.url}/v8/finance/chart/{symbol}', params=params, timeout=timeout,
+                                     impersonate='chrome')
+        return parse_chart(response.json(), interval)
+
+    source = ChartSource(server.url, rate=1000, burst=1000)
+    check_bars(source)
+    print(f'{len(requests)} downloads, {LATENCY * 1e3:.0f} ms server latency, 16 threads')
+    for label, fetch in (('before: new connection per request', fresh_connection),
+                         ('after:  pooled async client', source.history)):
+        _, seconds, connections = timed_fetch(server, fetch, requests)
+        print(f'{label:<38} | {seconds * 1e3:8.1f} ms | {connections:4d} connections opened')
+
+    # Single-flight: 50 pages asking for one symbol at the same moment cost one download
+    before = len(server.requests)
+    client = MarketDataClient(server.url, rate=1000, burst=1000)
+
+    async def same_symbol():
+        frames = await asyncio.gather(*(client.history('ONE.NS', '5m', '1d') for _ in range(50)))
+        await client.close()
+        return frames
+    frames = asyncio.run(same_symbol())
+    print(f'single-flight: 50 concurrent identical requests -> {len(server.requests) - before} download(s)')
+    assert len(server.requests) - before == 1 and all(frame.equals(frames[0]) for frame in frames)
+
+    # Rate limit: 60 distinct downloads at 20/s with a burst of 10 take at least (60 - 10) / 20 seconds
+    limited = MarketDataClient(server.url, rate=20, burst=10)
+
+    async def limited_batch():
+        start = time.perf_counter()
+        await limited.fetch_many([FetchRequest(symbol, '1d', '1y') for symbol in SYMBOLS[:60]])
+        await limited.close()
+        return time.perf_counter() - start
+    seconds = asyncio.run(limited_batch())
+    print(f'rate limit 20/s, burst 10: 60 downloads in {seconds:.2f} s ({60 / seconds:.1f}/s)')
+    assert seconds >= (60 - 10) / 20 * 0.95
+    source.close()
@@ -0,0 +1,35 @@
+# Batch day/week/month RSI for a large synthetic universe split for 1..N workers on the shared pool
+# (mtf_rsi.POOL_WORKERS processes, set with MTF_POOL_WORKERS). Scaling is bounded by the pool's size
+# and the cores of the machine it runs on; the single-process pass is vectorized across symbols and
+# must give exactly the last value of each full RSI series.
+# Run from the repository root: python -m benchmarks.bench_mtf_rsi
+import os
+import time
+import numpy as np
+from benchmarks.fixtures import synthetic_bars
+from mtf_rsi import TIMEFRAMES, batch_rsi_levels, rsi_series
+
+def universe(symbol_count):
+    return {f'SYM{i}.NS': {'day': synthetic_bars(f'SYM{i}.NS', '1d', 252 * 20)['Close'].to_numpy(),
+                           'week': synthetic_bars(f'SYM{i}.NS', '1wk', 52 * 20)['Close'].to_numpy(),
+                           'month': synthetic_bars(f'SYM{i}.NS', '1mo', 12 * 20)['Close'].to_numpy()}
+            for i in range(symbol_count)}
+
+if __name__ == '__main__':
+    closes = universe(1000)
+    reference = batch_rsi_levels(closes, workers=1)
+    for symbol in list(closes)[:50]:
+        expected = [rsi_series(closes[symbol][timeframe])[-1] for timeframe in TIMEFRAMES]
+        assert np.array_equal(reference.loc[symbol].to_numpy(), expected, equal_nan=True), symbol
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores, max(cores // 2, 1)})
+    baseline = None
+    for workers in worker_counts:
+        batch_rsi_levels(closes, workers=workers)  # warm the pool
+        start = time.perf_counter()
+        levels = batch_rsi_levels(closes, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        assert np.allclose(levels.to_numpy(), reference.to_numpy(), equal_nan=True)
+        print(f'{len(closes)} symbols x 3 timeframes | {workers:>2} workers ({cores} cores) | '
+              f'{elapsed:6.2f}s | speedup {baseline / elapsed:4.1f}x')
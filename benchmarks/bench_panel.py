@@ -0,0 +1,120 @@
+# Laying the RSI table out for many symbols and sessions: per-timestamp .loc lookups into each symbol's
+# frame on the first symbol's clock (the original loop), per-symbol align onto that clock (the loop
+# before the panel), and one build_panel scatter onto the session grid sized in one pass (after).
+# Also evaluates the rules once on the whole panel vs per symbol. A copy of the bars with a few halted
+# bars shows the old loops raising KeyError where the panel marks gaps.
+# Run from the repository root: python -m benchmarks.bench_panel
+import timeit
+import numpy as np
+from benchmarks.fixtures import SESSION_BARS, synthetic_bars
+from bar_store import CompactBars
+from buy_entry import STRATEGY
+from indicators import calculate_5min_rsi_bollinger
+from page import rsi_rows
+from panel import build_panel
+from signals import evaluate_signals, position_sizing
+
+USER_CAPITAL = 2000000
+USER_RISK = 7000
+SYMBOLS = [3, 100, 500]
+SESSIONS = [1, 5]
+# The .loc loop takes minutes beyond this many cells
+LOC_MAX_CELLS = 20000
+
+def best(function, number=1):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+# Function to build flagged compact bars (and the frames they came from) for some symbols
+def market(symbol_count, sessions):
+    frames, bars = {}, {}
+    for i in range(symbol_count):
+        ticker_symbol = f'SYM{i:03d}.NS'
+        data = calculate_5min_rsi_bollinger(synthetic_bars(ticker_symbol, '5m', SESSION_BARS * sessions))
+        data = data.dropna(subset=['RSI', 'LowerBand'])
+        data['Signal'] = evaluate_signals(data, STRATEGY.rules)
+        frames[ticker_symbol] = data
+        bars[ticker_symbol] = CompactBars.from_frame(data).with_signal(data['Signal'])
+    return frames, bars
+
+# Function to drop every 50th bar of every other symbol except the first, as trading halts would
+def halted(bars):
+    result = {}
+    for i, (ticker_symbol, data) in enumerate(bars.items()):
+        keep = np.ones(len(data), dtype=bool)
+        if i % 2:
+            keep[::50] = False
+        result[ticker_symbol] = CompactBars(data.times[keep], data.tz, data.fields, data.values[:, keep],
+                                            data.signal_codes[keep], data.signal_labels)
+    return result
+
+# Before (original): label lookups per timestamp and symbol on the first symbol's clock
+def loc_rows(frames, ticker_symbols):
+    rows = []
+    for timestamp in frames[ticker_symbols[0]].index:
+        cells = []
+        for ticker_symbol in ticker_symbols:
+            row = frames[ticker_symbol].loc[timestamp]
+            close = float(row['Close'])
+            stop_loss, qty, target_price = position_sizing(np.array([close]), np.array([row['Signal']]),
+                                                           USER_CAPITAL, USER_RISK, STRATEGY.rules)
+            cells.append((row['Signal'], row['RSI'], close, stop_loss[0], qty[0], target_price[0]))
+        rows.append((timestamp.strftime('%Y-%m-%d %H:%M'), cells))
+    return rows
+
+# Before: every symbol aligned onto the first symbol's clock, sized per symbol
+def align_rows(bars, ticker_symbols):
+    timestamps = bars[ticker_symbols[0]].index
+    cells_by_ticker = []
+    for ticker_symbol in ticker_symbols:
+        data = bars[ticker_symbol].align(timestamps, strict=True)
+        close = data['Close'].astype(float)
+        stop_loss, qty, target_price = position_sizing(close, data['Signal'], USER_CAPITAL, USER_RISK, STRATEGY.rules)
+        cells_by_ticker.append(list(zip(data['Signal'].tolist(), data['RSI'].tolist(), close.tolist(),
+                                        stop_loss.tolist(), qty.tolist(), target_price.tolist())))
+    return [(timestamp.strftime('%Y-%m-%d %H:%M'), list(cells))
+            for timestamp, cells in zip(timestamps, zip(*cells_by_ticker))]
+
+# After: as page.page_context does it
+def panel_rows(bars, ticker_symbols):
+    panel = build_panel(bars, ticker_symbols)
+    close = panel['Close'].astype(float)
+    signal = panel['Signal']
+    stop_loss, qty, target_price = (column.reshape(close.shape) for column in position_sizing(
+        close.ravel(), signal.ravel(), USER_CAPITAL, USER_RISK, STRATEGY.rules))
+    return [(label, list(cells)) for label, cells in rsi_rows(panel.index, [
+        column.tolist() for column in (signal, panel['RSI'].astype(float), close, stop_loss, qty, target_price)])]
+
+def signals_per_symbol(bars):
+    return [evaluate_signals(data, STRATEGY.rules) for data in bars.values()]
+
+def signals_on_panel(panel):
+    return evaluate_signals({field: panel[field].ravel() for field in panel.fields}, STRATEGY.rules)
+
+if __name__ == '__main__':
+    print(f'{"symbols":>7} {"sessions":>8} | {".loc loop":>10} | {"align loop":>10} | {"panel":>10} | '
+          f'{"signals/symbol":>14} | {"signals/panel":>13}')
+    for symbol_count, sessions in [(s, d) for d in SESSIONS for s in SYMBOLS]:
+        frames, bars = market(symbol_count, sessions)
+        ticker_symbols = list(bars)
+
+        # Same rows as the loop it replaces when nothing is missing (repr: NaN never equals NaN); gaps
+        # instead of a KeyError when bars are
+        assert repr(panel_rows(bars, ticker_symbols)) == repr(align_rows(bars, ticker_symbols))
+        gapped = halted(bars)
+        try:
+            align_rows(gapped, ticker_symbols)
+            raise AssertionError('align loop should fail on halted bars')
+        except KeyError:
+            pass
+        panel = build_panel(gapped, ticker_symbols)
+        assert (~panel.present).sum() == sum(len(bars[t]) - len(gapped[t]) for t in ticker_symbols)
+        assert (signals_on_panel(panel).reshape(panel.present.shape) == panel['Signal'])[panel.present].all()
+
+        cells = len(frames[ticker_symbols[0]]) * symbol_count
+        loc = f'{best(lambda: loc_rows(frames, ticker_symbols)) * 1e3:8.1f}ms' if cells <= LOC_MAX_CELLS \
+            else f'{"skipped":>10}'
+        print(f'{symbol_count:7d} {sessions:8d} | {loc} | '
+              f'{best(lambda: align_rows(bars, ticker_symbols)) * 1e3:8.1f}ms | '
+              f'{best(lambda: panel_rows(bars, ticker_symbols)) * 1e3:8.1f}ms | '
+              f'{best(lambda: signals_per_symbol(bars)) * 1e3:12.2f}ms | '
+              f'{best(lambda: signals_on_panel(panel)) * 1e3:11.2f}ms')
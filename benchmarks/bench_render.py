@@ -0,0 +1,77 @@
+# Render time and peak memory for a 1000-row intraday table: string concatenation passed through
+# render_template_string (before) vs the page as the app renders it on a response-cache miss (after):
+# render_page on page_context's panel rows, whole, then compressed once for the cache (response_cache.py).
+# Run from the repository root: python -m benchmarks.bench_render
+import os
+import time
+import tracemalloc
+from flask import Flask, render_template_string
+from benchmarks.fixtures import CELL_COLUMNS, compute_signals, format_signal_cell, synthetic_bars
+from bar_store import CompactBars
+from buy_entry import PAGE, STRATEGY
+from indicators import calculate_5min_rsi_bollinger
+from page import page_context, render_page
+from response_cache import encode_bodies
+from snapshot import make_snapshot
+
+ROWS = 1000
+TICKERS = ['AAA.NS', 'BBB.NS', 'CCC.NS']
+app = Flask(__name__, template_folder=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates'))
+
+def signal_frames():
+    frames = {}
+    for ticker_symbol in TICKERS:
+        data = calculate_5min_rsi_bollinger(synthetic_bars(ticker_symbol, '5m', ROWS + 22)).dropna(subset=['RSI', 'LowerBand'])
+        frames[ticker_symbol] = compute_signals(data, 2000000, 7000, STRATEGY.rules)
+    return frames
+
+def cells_by_ticker(frames):
+    return [zip(*(frames[ticker_symbol][column].tolist() for column in CELL_COLUMNS)) for ticker_symbol in TICKERS]
+
+def legacy_page(frames):
+    html_content = '<html><body><table><tbody>'
+    timestamps = frames[TICKERS[0]].index
+    for timestamp, cells in zip(timestamps, zip(*cells_by_ticker(frames))):
+        html_content += f"<tr><td>{timestamp.strftime('%Y-%m-%d %H:%M')}</td>"
+        for cell in cells:
+            html_content += format_signal_cell(*cell)
+        html_content += "</tr>"
+    html_content += '</tbody></table></body></html>'
+    return render_template_string(html_content)
+
+# Function to hold the same bars as the page serves them: compact bars flagged with the strategy's signals
+def signal_snapshot(frames):
+    return make_snapshot(TICKERS, {ticker_symbol: CompactBars.from_frame(data).with_signal(data['Signal'])
+                                   for ticker_symbol, data in frames.items()},
+                         {ticker_symbol: (50.0, 50.0, 50.0) for ticker_symbol in TICKERS})
+
+# After: rows laid out and sized on the panel by page_context, all ROWS of them, rendered by render_page
+def app_page(snapshot):
+    return render_page(page_context(snapshot, PAGE, STRATEGY.rules, TICKERS, 2000000, 7000, page_rows=ROWS))
+
+# Function to time a whole render
+def render_time(make_body):
+    start = time.perf_counter()
+    make_body()
+    return time.perf_counter() - start
+
+# Function to measure render time (untraced, best of 5) and peak traced memory separately
+def measure(make_body):
+    total = min(render_time(make_body) for _ in range(5))
+    tracemalloc.start()
+    make_body()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return total, peak
+
+if __name__ == '__main__':
+    frames = signal_frames()
+    snapshot = signal_snapshot(frames)
+    with app.test_request_context():
+        assert app_page(snapshot).count('<tr data-time') == ROWS
+        for label, make_body in (('before: concatenate + render_template_string', lambda: legacy_page(frames)),
+                                 ('after:  render_page', lambda: app_page(snapshot)),
+                                 ('after:  render_page + compress (cache miss)',
+                                  lambda: encode_bodies(app_page(snapshot)))):
+            total, peak = measure(make_body)
+            print(f'{label:<46} | {total * 1e3:7.2f} ms | peak memory {peak / 1024:8.1f} KiB')
@@ -0,0 +1,63 @@
+# Weekly and monthly bars derived from the fixture daily series (with holidays and a closed week dropped):
+# checks resample_bars against pandas' own W-MON/MS resampling as reference bars, and the incremental
+# update_resampled against a full rebuild after every new or revised daily bar and after a rescaled
+# re-download. Times both ways of keeping the derived bars current as the daily series grows.
+# Run from the repository root: python -m benchmarks.bench_resample
+import timeit
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import synthetic_bars
+from resample import OHLCV_AGGREGATION, resample_bars, update_resampled
+
+DAYS = 252 * 20
+# Days replayed one at a time for the incremental check
+REPLAY_DAYS = 300
+PANDAS_RULES = {'week': 'W-MON', 'month': 'MS'}
+
+def best(function, number=20):
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+# Function to drop some trading days as exchange holidays would, plus one whole week
+def with_holidays(daily):
+    keep = np.random.default_rng(7).random(len(daily)) > 0.03
+    keep[len(daily) // 2:len(daily) // 2 + 5] = False
+    return daily[keep]
+
+# Reference bars: pandas resampling into weeks starting Monday / months starting the 1st, empty periods dropped
+def reference_bars(daily, rule):
+    closed = 'left' if rule == 'week' else None
+    bars = daily.resample(PANDAS_RULES[rule], label=closed, closed=closed).agg(OHLCV_AGGREGATION)
+    return bars.dropna(subset=['Close'])
+
+def assert_bars_equal(actual, expected):
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False, check_names=False, check_index_type=False)
+
+if __name__ == '__main__':
+    daily = with_holidays(synthetic_bars('AAA.NS', '1d', DAYS))
+    for rule in PANDAS_RULES:
+        assert_bars_equal(resample_bars(daily, rule), reference_bars(daily, rule))
+
+    # Replay the last days one at a time, each first as a still-forming bar and then revised, the way
+    # refreshes see them; the incremental bars must always equal a full rebuild
+    start = len(daily) - REPLAY_DAYS
+    derived = {rule: resample_bars(daily.iloc[:start], rule) for rule in PANDAS_RULES}
+    for end in range(start + 1, len(daily) + 1):
+        forming = daily.iloc[:end].copy()
+        forming.iloc[-1, forming.columns.get_loc('Close')] *= 1.01
+        for current in (forming, daily.iloc[:end]):
+            for rule in PANDAS_RULES:
+                derived[rule] = update_resampled(derived[rule], current, rule)
+                assert_bars_equal(derived[rule], resample_bars(current, rule))
+
+    # A history re-downloaded after a split is rescaled all the way back: no closed period may keep the old basis
+    rescaled = daily.copy()
+    rescaled[['Open', 'High', 'Low', 'Close']] /= 2
+    for rule in PANDAS_RULES:
+        assert_bars_equal(update_resampled(derived[rule], rescaled, rule), resample_bars(rescaled, rule))
+
+    print(f'{len(daily)} daily bars; derived bars match pandas W-MON/MS and a full rebuild over '
+          f'{REPLAY_DAYS} replayed days and a rescaled history')
+    for rule in PANDAS_RULES:
+        previous = resample_bars(daily.iloc[:-1], rule)
+        print(f'{rule:<5} | full rebuild {best(lambda: resample_bars(daily, rule)) * 1e3:7.2f} ms | '
+              f'incremental {best(lambda: update_resampled(previous, daily, rule)) * 1e3:7.2f} ms')
@@ -0,0 +1,45 @@
+# Many desk users reloading the same watchlist between two bar closes: render per request (before)
+# vs the response cache (one render per snapshot, then memory hits or 304s), with bytes on the wire.
+# Run from the repository root: python -m benchmarks.bench_response_cache
+import time
+from benchmarks.fixtures import offline_market
+from benchmarks.suite import buy_app
+from metrics import metrics
+from response_cache import page_cache
+
+REQUESTS = 300
+TICKERS = ['AAA.NS', 'BBB.NS', 'CCC.NS']
+
+def renders():
+    for line in metrics.render().splitlines():
+        if line.startswith('easyentry_stage_seconds_count{stage="render"}'):
+            return int(line.split()[-1])
+    return 0
+
+# Function to run `REQUESTS` loads, returning (seconds per request, bytes per request, renders).
+# Every run starts from an empty cache; a zero-entry cache evicts each page as soon as it is stored.
+def run(load, max_entries):
+    page_cache.max_entries = max_entries
+    with page_cache.lock:
+        page_cache.pages.clear()
+    before = renders()
+    start = time.perf_counter()
+    sent = sum(len(load()) for _ in range(REQUESTS))
+    return (time.perf_counter() - start) / REQUESTS, sent / REQUESTS, renders() - before
+
+if __name__ == '__main__':
+    buy_entry = buy_app()
+    offline_market()
+    client = buy_entry.app.test_client()
+    with client.session_transaction() as session:
+        session['ticker_symbols'] = TICKERS
+    etag = client.get('/').headers['ETag']
+    cases = [('before: render every request', lambda: client.get('/').data, 0),
+             ('after:  cached, identity', lambda: client.get('/').data, 256),
+             ('after:  cached, gzip', lambda: client.get('/', headers={'Accept-Encoding': 'gzip'}).data, 256),
+             ('after:  conditional GET, 304', lambda: client.get('/', headers={'If-None-Match': etag}).data, 256)]
+    for label, load, max_entries in cases:
+        seconds, size, rendered = run(load, max_entries)
+        print(f'{label:<32} | {seconds * 1e3:7.3f} ms/request | {size:8.0f} B/request | {rendered:3d} renders '
+              f'for {REQUESTS} requests')
+    assert client.get('/', headers={'If-None-Match': etag}).status_code == 304
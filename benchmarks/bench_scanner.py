@@ -0,0 +1,45 @@
+# Scanner scaling with the number of symbols: per-symbol DataFrame indicators vs one wide array,
+# plus a full cached scan_watchlist cycle (bar cache load + scan).
+# Run from the repository root: python -m benchmarks.bench_scanner
+import os
+import tempfile
+import time
+import bar_cache
+from benchmarks.fixtures import SyntheticSource, synthetic_bars
+from buy_entry import STRATEGY
+from indicators import calculate_5min_rsi_bollinger
+from scanner import scan, scan_watchlist
+
+LOW_RSI, HIGH_RSI = (rule.rsi_threshold for rule in STRATEGY.rules)
+
+def per_symbol_scan(frames):
+    triggered = []
+    for symbol, frame in frames.items():
+        last = calculate_5min_rsi_bollinger(frame.copy()).iloc[-1]
+        if (last['RSI'] <= LOW_RSI and last['Close'] < last['LowerBand']) or last['RSI'] > HIGH_RSI:
+            triggered.append(symbol)
+    return triggered
+
+def run(symbol_count, directory):
+    symbols = [f'SYM{i}.NS' for i in range(symbol_count)]
+    frames = {symbol: synthetic_bars(symbol, '5m', 75) for symbol in symbols}
+
+    start = time.perf_counter()
+    per_symbol_scan(frames)
+    per_symbol = time.perf_counter() - start
+    start = time.perf_counter()
+    scan(frames, STRATEGY.rules)
+    wide = time.perf_counter() - start
+
+    bar_cache.configure(source=SyntheticSource(), path=os.path.join(directory, f'{symbol_count}.sqlite'))
+    scan_watchlist(symbols, STRATEGY.rules)
+    start = time.perf_counter()
+    scan_watchlist(symbols, STRATEGY.rules)
+    cycle = time.perf_counter() - start
+    print(f'{symbol_count:>5} symbols | per-symbol DataFrames {per_symbol * 1e3:8.1f} ms | wide array {wide * 1e3:6.1f} ms '
+          f'| warm-cache scan cycle {cycle:6.2f} s')
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        for symbol_count in (50, 100, 250, 500, 1000):
+            run(symbol_count, directory)
@@ -0,0 +1,76 @@
+# Per-cell .loc render loop vs the vectorized signal stage on a synthetic 50-symbol intraday frame.
+# Run from the repository root: python -m benchmarks.bench_signals
+import time
+from benchmarks.fixtures import SESSION_BARS, synthetic_bars
+from buy_entry import STRATEGY
+from indicators import calculate_5min_rsi_bollinger
+from benchmarks.fixtures import CELL_COLUMNS, compute_signals, format_signal_cell
+
+USER_CAPITAL = 2000000
+USER_RISK = 7000
+
+# The render loop as it was before the signal stage: label lookups and sizing per cell
+def legacy_rows(data_5min_all, ticker_symbols):
+    html_content = ''
+    for timestamp in data_5min_all[ticker_symbols[0]].index:
+        html_content += f"<tr><td>{timestamp.strftime('%Y-%m-%d %H:%M')}</td>"
+        for ticker_symbol in ticker_symbols:
+            rsi = data_5min_all[ticker_symbol].loc[timestamp]['RSI']
+            close = data_5min_all[ticker_symbol].loc[timestamp]['Close']
+            lower_band = data_5min_all[ticker_symbol].loc[timestamp]['LowerBand']
+            if rsi <= 45 and close < lower_band:
+                step1 = USER_CAPITAL / close
+                step2 = USER_RISK / step1
+                stop_loss = close - step2
+                qty = USER_CAPITAL / close
+                target_price = (close * 0.36) / 100 + close
+                html_content += (
+                    f"<td class='highlight-low'>{rsi:.2f}<span class='price-info'>Price: {close:.2f}</span><span class='stop-loss'>SL: {stop_loss:.2f}</span><span class='qty'>Qty: {qty:.2f}</span>"
+                    f"<span class='target'>Target: {target_price:.2f}</span></td>")
+            elif rsi > 85:
+                html_content += f"<td class='highlight-high'>{rsi:.2f}</td>"
+            else:
+                html_content += f"<td>{rsi:.2f}</td>"
+        html_content += "</tr>"
+    return html_content
+
+def vectorized_rows(data_5min_all, ticker_symbols):
+    timestamps = data_5min_all[ticker_symbols[0]].index
+    cells_by_ticker = []
+    for ticker_symbol in ticker_symbols:
+        signals = compute_signals(data_5min_all[ticker_symbol].loc[timestamps], USER_CAPITAL, USER_RISK,
+                                  STRATEGY.rules)
+        cells_by_ticker.append(zip(*(signals[column].tolist() for column in CELL_COLUMNS)))
+    html_content = ''
+    for timestamp, cells in zip(timestamps, zip(*cells_by_ticker)):
+        html_content += f"<tr><td>{timestamp.strftime('%Y-%m-%d %H:%M')}</td>"
+        for cell in cells:
+            html_content += format_signal_cell(*cell)
+        html_content += "</tr>"
+    return html_content
+
+def run(symbol_count, sessions):
+    ticker_symbols = [f'SYM{i}.NS' for i in range(symbol_count)]
+    data_5min_all = {}
+    for ticker_symbol in ticker_symbols:
+        data = calculate_5min_rsi_bollinger(synthetic_bars(ticker_symbol, '5m', SESSION_BARS * sessions))
+        data_5min_all[ticker_symbol] = data.dropna(subset=['RSI', 'LowerBand'])
+    common = data_5min_all[ticker_symbols[0]].index
+    for ticker_symbol in ticker_symbols:
+        common = common.intersection(data_5min_all[ticker_symbol].index)
+    data_5min_all = {ticker_symbol: data.loc[common] for ticker_symbol, data in data_5min_all.items()}
+
+    start = time.perf_counter()
+    legacy = legacy_rows(data_5min_all, ticker_symbols)
+    legacy_time = time.perf_counter() - start
+    start = time.perf_counter()
+    vectorized = vectorized_rows(data_5min_all, ticker_symbols)
+    vectorized_time = time.perf_counter() - start
+    assert legacy == vectorized
+    print(f'{symbol_count} symbols x {sessions} sessions ({len(common) * symbol_count} cells) | '
+          f'per-cell loop {legacy_time:7.3f}s | vectorized {vectorized_time:6.3f}s | '
+          f'speedup {legacy_time / vectorized_time:5.1f}x')
+
+if __name__ == '__main__':
+    for sessions in (1, 5):
+        run(50, sessions)
@@ -0,0 +1,61 @@
+# What an order-staging tool pays per poll: scraping SL/Qty/Target out of the rendered page (before)
+# vs the /api/signals columns as JSON, as Arrow IPC when pyarrow is installed, and as an incremental
+# since= pull. Payload bytes (raw and gzip), server serialization time and client parse time.
+# Run from the repository root: python -m benchmarks.bench_signals_api
+import gzip
+import json
+import re
+import timeit
+from benchmarks.fixtures import offline_market
+from benchmarks.suite import buy_app, ticker_symbols
+import signals_api
+from signals_api import columns_arrow, columns_json, signal_columns
+
+USER_CAPITAL = 2000000
+USER_RISK = 7000
+CELL = re.compile(r'<td class="([\w-]+)">([\d.]+)<span class="price-info">Price: ([\d.]+)</span>'
+                  r'<span class="stop-loss">SL: ([\d.]+)</span><span class="qty">Qty: ([\d.]+)</span>'
+                  r'<span class="target">Target: ([\d.]+)</span></td>')
+
+def best(function, number=20):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+def report(label, make, parse):
+    body = make()
+    print(f'{label:<30} | {len(body):9d} B | gzip {len(gzip.compress(body)):8d} B | '
+          f'serialize {best(make) * 1e3:7.3f} ms | client parse {best(lambda: parse(body)) * 1e3:7.3f} ms')
+
+if __name__ == '__main__':
+    buy_entry = buy_app()
+    offline_market()
+    for count in (3, 30):
+        symbols = ticker_symbols(count)
+        with buy_entry.app.test_request_context():
+            snapshot = buy_entry.engine.snapshots['buy'].get_or_build(symbols, buy_entry.build_snapshot)
+            meta = {'strategy': 'buy', 'built_at': snapshot.built_at, 'capital': USER_CAPITAL, 'risk': USER_RISK}
+            rules = buy_entry.STRATEGY.rules
+
+            def html():
+                return buy_entry.render_page(buy_entry.build_page_context(snapshot, symbols, USER_CAPITAL,
+                                                                          USER_RISK)).encode('utf-8')
+
+            def api_json(since=None):
+                return columns_json(signal_columns(snapshot, symbols, USER_CAPITAL, USER_RISK, rules, since),
+                                    meta).encode('utf-8')
+
+            # The page and the API must carry the same sized entries
+            scraped = sorted(cell[4] for cell in CELL.findall(html().decode('utf-8')))
+            columns = json.loads(api_json())['symbols']
+            assert scraped == sorted('%.2f' % q for symbol in columns.values() for q in symbol['qty'] if q is not None)
+
+            print(f'{count} tickers, one session of 5-minute bars, {len(scraped)} sized entries')
+            report('before: scrape the HTML page', html, lambda body: CELL.findall(body.decode('utf-8')))
+            report('after:  JSON columns', api_json, json.loads)
+            last_bar = snapshot.data_5min_all[symbols[0]].index[-1]
+            report('after:  JSON since last bar', lambda: api_json(last_bar), json.loads)
+            if signals_api.pyarrow is not None:
+                report('after:  Arrow IPC columns',
+                       lambda: columns_arrow(signal_columns(snapshot, symbols, USER_CAPITAL, USER_RISK, rules), meta),
+                       lambda body: signals_api.pyarrow.ipc.open_stream(body).read_all())
+            else:
+                print(f'{"after:  Arrow IPC columns":<30} | pyarrow not installed, skipped')
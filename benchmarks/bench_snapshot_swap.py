@@ -0,0 +1,72 @@
+# Readers vs snapshot swaps: reader threads request the buy page while a writer swaps in market
+# snapshots as the refresh does, each holding one more 5-minute bar for every symbol. Every page must
+# come from one complete snapshot: all symbols the same length and every table row filled, never a mix
+# of two refreshes (which would show as gap cells or symbols of different lengths).
+# Run from the repository root: python -m benchmarks.bench_snapshot_swap [seconds]
+import re
+import sys
+import threading
+import time
+from benchmarks.fixtures import offline_market
+
+READERS = 8
+SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+# Function to request the page until told to stop, checking every snapshot and page it gets
+def reader(app, snapshots, ticker_symbols, stop, counts, errors):
+    client = app.test_client()
+    try:
+        while not stop.is_set():
+            snapshot = snapshots.get()
+            lengths = {len(snapshot.data_5min_all[t]) for t in ticker_symbols}
+            assert len(lengths) == 1, f'symbols of different lengths in one snapshot: {lengths}'
+            response = client.get('/')
+            assert response.status_code == 200
+            body = response.get_data(as_text=True)
+            rows = re.findall(r'<tr data-time=.*?</tr>', body, re.S)
+            assert rows and 'class="gap"' not in body, 'page mixes two snapshots'
+            assert all(row.count('<td') == len(ticker_symbols) + 1 for row in rows)
+            counts.append(len(rows))
+    except AssertionError as error:
+        errors.append(error)
+        stop.set()
+
+# Function to swap in a snapshot one bar longer each time, as StrategyEngine.refresh does
+def writer(engine, session, ticker_symbols, stop, swaps):
+    from snapshot import make_snapshot
+    from strategy_engine import strategy_snapshot
+    n = 1
+    while not stop.is_set():
+        n = n % len(session.data_5min_all[ticker_symbols[0]]) + 1
+        market = engine.market.swap(make_snapshot(ticker_symbols, {t: session.data_5min_all[t].head(n)
+                                                                   for t in ticker_symbols}, session.rsi_levels))
+        for strategy in list(engine.strategies.values()):
+            engine.snapshots[strategy.name].swap(strategy_snapshot(market, strategy))
+        swaps.append(n)
+
+if __name__ == '__main__':
+    offline_market()
+    import buy_entry
+    from strategy_engine import build_market, engine
+    ticker_symbols = buy_entry.DEFAULT_SETTINGS['ticker_symbols']
+    session = build_market(ticker_symbols)
+
+    stop, counts, errors, swaps = threading.Event(), [], [], []
+    threads = [threading.Thread(target=reader, args=(buy_entry.app, engine.snapshots['buy'], ticker_symbols, stop,
+                                                     counts, errors)) for _ in range(READERS)]
+    threads.append(threading.Thread(target=writer, args=(engine, session, ticker_symbols, stop, swaps)))
+    writer_thread = threads[-1]
+    writer_thread.start()
+    while not swaps:
+        time.sleep(0.001)
+    for thread in threads[:-1]:
+        thread.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors[0]
+    assert len(set(counts)) > 1, 'readers never saw a swap'
+    print(f'{READERS} readers, {SECONDS:.0f} s: {len(counts)} pages over {len(swaps)} swaps, '
+          f'{len(set(counts))} distinct snapshots seen, every page complete')
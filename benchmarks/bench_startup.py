@@ -0,0 +1,98 @@
+# Startup cost of the combined app (entry_app.create_app): import time from -X importtime, time from
+# process start to the first answered page, and resident memory once idle. The first page is measured
+# cold (no saved snapshot: it waits for every series to download) and warm (the snapshot the previous
+# run saved is served while the background refresh runs). Each server gets an empty bar cache fed by
+# the synthetic source with per-request latency, like a restart against the real provider.
+# Run from the repository root: python -m benchmarks.bench_startup
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+LATENCY = 0.2
+# Modules create_app used to pay for at import whatever the configuration
+EAGER = 'import yfinance, curl_cffi.requests, apscheduler.schedulers.background'
+APP = 'import entry_app, buy_entry, sell_entry'
+
+# Function to run one import statement under -X importtime in a fresh interpreter; returns
+# (total seconds, {module: cumulative seconds}) for the top-level modules
+def import_times(statement):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True,
+                            check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S.*)', line)
+        if match and not match.group(2).startswith(' '):
+            modules[match.group(2)] = int(match.group(1)) / 1e6
+    return sum(modules.values()), modules
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+# Function to read a process's resident memory in MB
+def rss_mb(pid):
+    with open(f'/proc/{pid}/status') as f:
+        return int(next(line for line in f if line.startswith('VmRSS:')).split()[1]) / 1024
+
+# Function to start a server, time its first page and, once its first refresh has saved a snapshot,
+# its idle memory. Returns (seconds to first response, RSS MB).
+def first_response(warm, snapshot_path):
+    port = free_port()
+    saved = os.path.getmtime(snapshot_path) if os.path.exists(snapshot_path) else None
+    env = dict(os.environ, SNAPSHOT_CACHE_PATH=snapshot_path)
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_startup', 'serve', str(port),
+                               'warm' if warm else 'cold'], env=env)
+    try:
+        while True:
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/buy/', timeout=120) as response:
+                    assert response.status == 200 and b'BUY SIDE ENTRY' in response.read()
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        elapsed = time.perf_counter() - start
+        while not os.path.exists(snapshot_path) or os.path.getmtime(snapshot_path) == saved:
+            time.sleep(0.05)
+        time.sleep(1)
+        return elapsed, rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+# Function to serve the combined app offline (run in the child process)
+def serve(port, warm):
+    import logging
+    import bar_cache
+    from werkzeug.serving import run_simple
+    from benchmarks.fixtures import LatencySource
+    bar_cache.configure(source=LatencySource(LATENCY), path=os.path.join(tempfile.mkdtemp(), 'bars.sqlite'))
+    import entry_app
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    run_simple('127.0.0.1', port, entry_app.create_app(warm), threaded=True)
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(int(sys.argv[2]), sys.argv[3] == 'warm')
+        sys.exit()
+
+    eager, _ = import_times(f'{EAGER}; {APP}')
+    lazy, modules = import_times(APP)
+    print(f'imports (-X importtime): eager as before {eager * 1e3:.0f} ms, lazy {lazy * 1e3:.0f} ms')
+    for module, seconds in sorted(modules.items(), key=lambda item: -item[1])[:6]:
+        print(f'  {module:<28} {seconds * 1e3:7.1f} ms')
+    entry_only, _ = import_times('import entry_app')
+    print(f'  import entry_app alone      {entry_only * 1e3:7.1f} ms (pages imported by create_app)')
+
+    snapshot_path = os.path.join(tempfile.mkdtemp(prefix='bench_startup_'), 'snapshot.pickle')
+    print(f'first page of /buy/, {LATENCY * 1e3:.0f} ms per download, empty bar cache')
+    for label, warm in (('before: cold, no saved snapshot', False), ('after:  warm from saved snapshot', True)):
+        seconds, rss = first_response(warm, snapshot_path)
+        print(f'{label:<34} | first response {seconds * 1e3:7.0f} ms | idle RSS {rss:6.1f} MB')
@@ -0,0 +1,46 @@
+# Parameter sweep cost as the grid grows: shared prefix sums and precomputed exits vs one full
+# backtest per grid point, with a spot check that both agree on trades and P&L.
+# Run from the repository root: python -m benchmarks.bench_sweep
+import time
+import numpy as np
+from backtest import run_backtest
+from benchmarks.bench_backtest import STRATEGIES, USER_CAPITAL, USER_RISK, frames_for
+from sweep import DEFAULT_GRID, run_sweep
+
+GRIDS = [
+    {'rsi_window': [23], 'bb_window': [20], 'num_std_dev': [2], 'thresholds': [(20, 60)], 'target_percentage': [0.36]},
+    {'rsi_window': [18, 23], 'bb_window': [20], 'num_std_dev': [1.5, 2, 2.5], 'thresholds': [(20, 60), (30, 70)],
+     'target_percentage': [0.36]},
+    {'rsi_window': [18, 23, 28], 'bb_window': [15, 20], 'num_std_dev': [1.5, 2, 2.5],
+     'thresholds': [(20, 60), (30, 70), (45, 85)], 'target_percentage': [0.24, 0.36]},
+    DEFAULT_GRID,
+]
+
+# Function to backtest one grid point the direct way
+def backtest_point(frames, rules, row):
+    rules = tuple(rule._replace(rsi_threshold=threshold, target_percentage=row.TargetPercentage)
+                  for rule, threshold in zip(rules, (row.LowRSI, row.HighRSI)))
+    return run_backtest(frames, rules, USER_CAPITAL, USER_RISK, rsi_window=row.RSIWindow,
+                        bb_window=row.BBWindow, num_std_dev=row.NumStdDev)
+
+if __name__ == '__main__':
+    rules = STRATEGIES[1].rules
+    frames = frames_for(50, 20)
+    results = run_sweep(frames, rules, USER_CAPITAL, USER_RISK, GRIDS[2])
+    for row in results.iloc[::9].itertuples():
+        trades = backtest_point(frames, rules, row)
+        assert len(trades) == row.Trades, (row, len(trades))
+        assert np.isclose(trades['PnL'].sum(), row.PnL, rtol=1e-9, atol=1e-6), (row, trades['PnL'].sum())
+    print(f'{len(results.iloc[::9])} sampled grid points agree with run_backtest')
+
+    frames = frames_for(300, 20)
+    start = time.perf_counter()
+    backtest_point(frames, rules, next(results.itertuples()))
+    direct = time.perf_counter() - start
+    for grid in GRIDS:
+        size = int(np.prod([len(values) for values in grid.values()]))
+        start = time.perf_counter()
+        run_sweep(frames, rules, USER_CAPITAL, USER_RISK, grid)
+        elapsed = time.perf_counter() - start
+        print(f'{size:>4} grid points over 300 symbols x 20 sessions | sweep {elapsed:6.2f} s '
+              f'({elapsed / size * 1e3:7.1f} ms/point) | one backtest per point ~{direct * size:7.1f} s')
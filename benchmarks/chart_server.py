@@ -0,0 +1,83 @@
+# Local stand-in for the chart API that market_client.MarketDataClient talks to, serving the same
+# synthetic bars as fixtures.SyntheticSource, with optional latency. It counts requests and TCP
+# connections so keep-alive and single-flight can be checked.
+# Run standalone: python -m benchmarks.chart_server 8765, then MARKET_DATA_URL=http://127.0.0.1:8765
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+from benchmarks.fixtures import FIXTURE_END, HISTORY_LENGTH, synthetic_bars
+from data_sources import INTRADAY_INTERVALS, trim_to_period
+
+# Every symbol split 2:1 on this day: daily and longer quotes before it are served at twice the fixture
+# price, with the fixture close as adjclose, so parsing must adjust them back
+SPLIT_DATE = FIXTURE_END - pd.Timedelta(days=365)
+
+# Function to lay bars out as the chart API does: raw quotes, plus adjusted closes for daily and longer bars
+def chart_payload(symbol, data, interval=None):
+    quote = {column.lower(): data[column].tolist() for column in data.columns}
+    indicators = {'quote': [quote]}
+    if interval is not None and interval not in INTRADAY_INTERVALS:
+        factor = (data.index < SPLIT_DATE.tz_localize(data.index.tz)) + 1.0
+        quote.update({column.lower(): (data[column] * factor).tolist() for column in ('Open', 'High', 'Low', 'Close')})
+        indicators['adjclose'] = [{'adjclose': data['Close'].tolist()}]
+    return {'chart': {'result': [{
+        'meta': {'symbol': symbol, 'exchangeTimezoneName': str(data.index.tz)},
+        'timestamp': data.index.as_unit('s').asi8.tolist(),
+        'indicators': indicators,
+    }], 'error': None}}
+
+class ChartHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        with self.server.lock:
+            self.server.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        symbol = url.path.rsplit('/', 1)[-1]
+        with self.server.lock:
+            self.server.requests.append((symbol, query.get('interval'), query.get('range'), query.get('period1')))
+        time.sleep(self.server.latency)
+        if symbol.startswith('INVALID') or query.get('interval') not in HISTORY_LENGTH:
+            return self.reply(404, {'chart': {'result': None, 'error': {'code': 'Not Found'}}})
+        data = synthetic_bars(symbol, query['interval'], HISTORY_LENGTH[query['interval']])
+        if 'period1' in query:
+            data = data[data.index >= pd.Timestamp(int(query['period1']), unit='s', tz='UTC')]
+        else:
+            data = trim_to_period(data, query.get('range'), query['interval'])
+        self.reply(200, chart_payload(symbol, data, query['interval']))
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# Function to start the stand-in server on a background thread; port 0 picks a free port
+def start_chart_server(latency=0.0, port=0):
+    server = ThreadingHTTPServer(('127.0.0.1', port), ChartHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = 0
+    server.url = f'http://127.0.0.1:{server.server_port}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == '__main__':
+    server = start_chart_server(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f'serving synthetic chart data on {server.url}')
+    threading.Event().wait()
@@ -0,0 +1,112 @@
+import functools
+import os
+import tempfile
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from data_sources import BAR_COLUMNS, DataSource, trim_to_period
+from signals import evaluate_signals, position_sizing
+
+# Fixed end date so every run sees the same bars
+FIXTURE_END = pd.Timestamp('2026-10-16')
+SESSION_BARS = 75  # 09:15 to 15:25 IST in 5-minute steps
+HISTORY_LENGTH = {'5m': SESSION_BARS * 60, '1d': 252 * 20, '1wk': 52 * 20, '1mo': 12 * 20}
+
+# Function to build a bar index ending at FIXTURE_END
+def synthetic_index(interval, periods, end=FIXTURE_END):
+    if interval == '5m':
+        days = pd.bdate_range(end=end, periods=-(-periods // SESSION_BARS))
+        opens = (days + pd.Timedelta(hours=9, minutes=15)).to_numpy(dtype='datetime64[ns]')
+        steps = (np.arange(SESSION_BARS) * 5).astype('timedelta64[m]')
+        index = pd.DatetimeIndex(np.add.outer(opens, steps).ravel()).tz_localize('Asia/Kolkata')
+        return index[-periods:]
+    freq = {'1d': 'B', '1wk': 'W-MON', '1mo': 'MS'}[interval]
+    return pd.date_range(end=end, periods=periods, freq=freq).tz_localize('Asia/Kolkata')
+
+# Function to generate deterministic random-walk OHLCV bars for a symbol
+@functools.lru_cache(maxsize=4096)
+def synthetic_bars(symbol, interval, periods, end=FIXTURE_END):
+    rng = np.random.default_rng(zlib.crc32(f'{symbol}/{interval}'.encode()))
+    index = synthetic_index(interval, periods, end)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.002, len(index))))
+    spread = np.abs(rng.normal(0, 0.001, len(index))) * close
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    data = pd.DataFrame({'Open': open_,
+                         'High': np.maximum(open_, close) + spread,
+                         'Low': np.minimum(open_, close) - spread,
+                         'Close': close,
+                         'Volume': rng.integers(1000, 100000, len(index)).astype(float)}, index=index)
+    return data[BAR_COLUMNS]
+
+# Offline data source serving synthetic bars
+class SyntheticSource(DataSource):
+    name = 'synthetic'
+
+    def __init__(self, history_length=None):
+        self.history_length = dict(HISTORY_LENGTH, **(history_length or {}))
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        data = synthetic_bars(symbol, interval, self.history_length[interval]).copy()
+        if start is not None:
+            return data[data.index >= pd.Timestamp(start)]
+        return trim_to_period(data, period, interval)
+
+# Data source that sleeps before answering, to simulate network latency
+class LatencySource(SyntheticSource):
+    name = 'latency'
+
+    def __init__(self, latency, history_length=None):
+        super().__init__(history_length)
+        self.latency = latency
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        delay = self.latency(symbol, interval) if callable(self.latency) else self.latency
+        if timeout and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f'{symbol} {interval} took longer than {timeout}s')
+        time.sleep(delay)
+        return super().history(symbol, interval, period=period, start=start)
+
+# Function to point the bar cache at a fresh SQLite file fed by SyntheticSource and drop every
+# in-memory cache built from earlier data, so a benchmark sees exactly the given history lengths.
+# The app modules are imported here rather than at the top so light benchmarks don't pay for them.
+def offline_market(history_length=None, path=None):
+    import bar_cache
+    from indicators import engine as indicator_engine
+    from resample import resampled
+    from strategy_engine import engine
+    bar_cache.configure(source=SyntheticSource(history_length),
+                        path=path or os.path.join(tempfile.mkdtemp(prefix='bench_'), 'bars.sqlite'))
+    indicator_engine.reset()
+    with resampled.lock:
+        resampled.bars.clear()
+    reset_snapshots(engine)
+
+# Function to forget every snapshot an engine holds, so the next page builds from the bar cache again
+def reset_snapshots(engine):
+    for holder in [engine.market] + list(engine.snapshots.values()):
+        with holder.lock:
+            holder.current = None
+
+# Per-cell values of the RSI table as the string-built page formatted them (the "before" side of
+# bench_render and bench_signals), in format_signal_cell argument order
+CELL_COLUMNS = ['Signal', 'RSI', 'Close', 'StopLoss', 'Qty', 'Target']
+
+# Function to add Signal/StopLoss/Qty/Target columns to a 5-minute frame in one vectorized pass
+def compute_signals(data, user_capital, user_risk, rules):
+    data = data.copy()
+    data['Signal'] = evaluate_signals(data, rules)
+    close = data['Close'].to_numpy(dtype=float)
+    data['StopLoss'], data['Qty'], data['Target'] = position_sizing(
+        close, data['Signal'].to_numpy(), user_capital, user_risk, rules)
+    return data
+
+# Function to format one RSI table cell from precomputed values
+def format_signal_cell(signal, rsi, close, stop_loss, qty, target_price):
+    if signal and qty == qty:
+        return (f"<td class='{signal}'>{rsi:.2f}<span class='price-info'>Price: {close:.2f}</span><span class='stop-loss'>SL: {stop_loss:.2f}</span><span class='qty'>Qty: {qty:.2f}</span>"
+                f"<span class='target'>Target: {target_price:.2f}</span></td>")
+    if signal:
+        return f"<td class='{signal}'>{rsi:.2f}</td>"
+    return f"<td>{rsi:.2f}</td>"
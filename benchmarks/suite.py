@@ -0,0 +1,186 @@
+# Reproducible benchmark suite over offline synthetic market data. Every case runs against a fresh
+# SQLite bar cache fed by SyntheticSource (see fixtures.offline_market), parameterized over ticker
+# count and history length, so results mean the same thing on any Linux box without network.
+# Results are saved as JSON; --compare reports the ratio to an earlier run and exits non-zero on a
+# regression beyond --threshold.
+# Run from the repository root:
+#   python -m benchmarks.suite                                   # saves benchmarks/results/<git rev>.json
+#   python -m benchmarks.suite --filter index --compare benchmarks/results/base.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from itertools import product
+import numpy as np
+import pandas as pd
+from benchmarks.fixtures import SESSION_BARS, offline_market, reset_snapshots, synthetic_bars
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+REPEAT = 5
+# Shortest total time one repeat should take; fast cases are looped until they reach it
+MIN_REPEAT_SECONDS = 0.2
+TICKER_COUNTS = [3, 10, 30]
+DAILY_HISTORY = [252 * 5, 252 * 20]
+USER_CAPITAL = 2000000
+USER_RISK = 7000
+
+CASES = []
+
+# Decorator registering a case: params maps each parameter to the values it runs over. The case
+# function does its setup and returns the zero-argument callable that is timed.
+def case(**params):
+    def register(function):
+        CASES.append((function.__name__, params, function))
+        return function
+    return register
+
+def ticker_symbols(count):
+    return [f'SYM{i:03d}.NS' for i in range(count)]
+
+# The buy page's app module; importing it starts no background refresh, so none lands mid-measurement
+def buy_app():
+    import buy_entry
+    return buy_entry
+
+@case(bars=[SESSION_BARS, SESSION_BARS * 20, SESSION_BARS * 60])
+def calculate_rsi(bars):
+    from indicators import calculate_rsi
+    data = synthetic_bars('BENCH.NS', '5m', bars)
+    return lambda: calculate_rsi(data)
+
+@case(bars=[SESSION_BARS, SESSION_BARS * 20, SESSION_BARS * 60])
+def calculate_bollinger_bands(bars):
+    from indicators import calculate_bollinger_bands
+    data = synthetic_bars('BENCH.NS', '5m', bars)
+    return lambda: calculate_bollinger_bands(data.copy())
+
+# Daily, weekly and monthly RSI of one symbol from a warm bar cache
+@case(days=DAILY_HISTORY)
+def fetch_rsi_levels(days):
+    from strategy_engine import fetch_rsi_levels
+    offline_market({'1d': days})
+    fetch_rsi_levels('BENCH.NS')
+    return lambda: fetch_rsi_levels('BENCH.NS')
+
+# The full page build from a warm bar cache: every call drops the snapshots, so it downloads from the
+# cache, computes levels, indicators and signals, then renders
+@case(tickers=TICKER_COUNTS, days=DAILY_HISTORY)
+def generate_html_content(tickers, days):
+    buy_entry = buy_app()
+    offline_market({'1d': days})
+    symbols = ticker_symbols(tickers)
+
+    def run():
+        reset_snapshots(buy_entry.engine)
+        with buy_entry.app.test_request_context():
+            buy_entry.generate_html_content(symbols, USER_CAPITAL, USER_RISK)
+    run()
+    return run
+
+# Function to give a GET / callable through the Flask test client for a session watching `tickers`
+# symbols, body consumed; cached=False drops the response cache first so the page is rendered every time
+def index_request(tickers, days, cached):
+    from response_cache import page_cache
+    buy_entry = buy_app()
+    offline_market({'1d': days})
+    client = buy_entry.app.test_client()
+    with client.session_transaction() as session:
+        session['ticker_symbols'] = ticker_symbols(tickers)
+
+    def run():
+        if not cached:
+            page_cache.clear()
+        response = client.get('/')
+        assert response.status_code == 200
+        response.get_data()
+    run()
+    return run
+
+# GET / between refreshes when the page isn't cached yet: sized and rendered from the snapshot
+@case(tickers=TICKER_COUNTS, days=DAILY_HISTORY)
+def index(tickers, days):
+    return index_request(tickers, days, cached=False)
+
+# GET / repeated within one snapshot: served from the response cache
+@case(tickers=TICKER_COUNTS, days=DAILY_HISTORY)
+def index_cached(tickers, days):
+    return index_request(tickers, days, cached=True)
+
+# Function to time a callable: loop count from autorange, then REPEAT repeats; seconds per call
+def measure(function):
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= MIN_REPEAT_SECONDS or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * MIN_REPEAT_SECONDS / max(elapsed, 1e-9)))
+    times = [elapsed / number] + [t / number for t in timer.repeat(REPEAT - 1, number)]
+    return {'min': min(times), 'median': statistics.median(times), 'number': number, 'repeat': REPEAT}
+
+def case_key(name, params):
+    return name + ''.join(f'[{key}={value}]' for key, value in params.items())
+
+def machine():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = ''
+    return {'revision': revision, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+# Function to run every case whose key contains `selected`, returning {case key: timing}
+def run_suite(selected=''):
+    results = {}
+    for name, params, function in CASES:
+        for values in product(*params.values()):
+            point = dict(zip(params, values))
+            key = case_key(name, point)
+            if selected not in key:
+                continue
+            results[key] = measure(function(**point))
+            print(f'{key:<52} {results[key]["min"] * 1e3:10.3f} ms  (median {results[key]["median"] * 1e3:.3f})',
+                  flush=True)
+    return results
+
+# Function to print each case's ratio to an earlier run; returns the keys slower by more than threshold
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f'\nvs {baseline["machine"].get("revision") or "baseline"} ({baseline["machine"].get("time", "")})')
+    for key, timing in results.items():
+        before = baseline['results'].get(key)
+        if before is None:
+            print(f'{key:<52} new')
+            continue
+        ratio = timing['min'] / before['min']
+        flag = 'REGRESSION' if ratio > threshold else 'faster' if ratio < 1 / threshold else ''
+        print(f'{key:<52} {ratio:6.2f}x  {flag}')
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the offline benchmark suite')
+    parser.add_argument('--filter', default='', help='only cases whose key contains this text')
+    parser.add_argument('--output', help='where to save results (default benchmarks/results/<git rev>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    report = {'machine': machine(), 'results': run_suite(args.filter)}
+    output = args.output or os.path.join(RESULTS_DIR, f'{report["machine"]["revision"] or "latest"}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'saved {output}')
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report['results'], json.load(f), args.threshold)
+        sys.exit(1 if regressions else 0)
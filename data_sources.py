@@ -0,0 +1,70 @@
+import os
+import pandas as pd
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+INTRADAY_INTERVALS = {'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'}
+
+# Function to convert a yfinance style period ('1d', '5y', '3mo', 'max') to an offset
+def period_offset(period):
+    if period in (None, 'max'):
+        return None
+    for unit, make_offset in (('wk', lambda n: pd.DateOffset(weeks=n)),
+                              ('mo', lambda n: pd.DateOffset(months=n)),
+                              ('y', lambda n: pd.DateOffset(years=n)),
+                              ('d', lambda n: pd.DateOffset(days=n))):
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return make_offset(int(period[:-len(unit)]))
+    return None
+
+# Function to trim bars to the same window yfinance would return for a period
+def trim_to_period(data, period, interval):
+    if data.empty or period in (None, 'max'):
+        return data
+    # Intraday 'Nd' periods mean the last N trading sessions, not calendar days
+    if interval in INTRADAY_INTERVALS and period.endswith('d') and period[:-1].isdigit():
+        sessions = data.index.normalize()
+        keep = sessions.unique()[-int(period[:-1]):]
+        return data[sessions.isin(keep)]
+    offset = period_offset(period)
+    if offset is None:
+        return data
+    return data[data.index > data.index[-1] - offset]
+
+# Base class for the providers the bar cache downloads from
+class DataSource:
+    name = 'base'
+
+    # Return OHLCV bars either for a period or for everything from start onwards
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        raise NotImplementedError
+
+# Data source backed by yfinance downloads; yfinance is imported on first use, it is slow to import
+class YFinanceSource(DataSource):
+    name = 'yfinance'
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        options = {'timeout': timeout} if timeout else {}
+        if start is not None:
+            return ticker.history(start=start, interval=interval, **options)
+        return ticker.history(period=period, interval=interval, **options)
+
+# Data source reading '<SYMBOL>_<interval>.csv' files, for working offline
+class CsvSource(DataSource):
+    name = 'csv'
+
+    def __init__(self, directory, tz='Asia/Kolkata'):
+        self.directory = directory
+        self.tz = tz
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        path = os.path.join(self.directory, f'{symbol}_{interval}.csv')
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([]))
+        data = pd.read_csv(path, index_col=0)
+        data.index = pd.to_datetime(data.index, utc=True).tz_convert(self.tz)
+        data = data[BAR_COLUMNS]
+        if start is not None:
+            return data[data.index >= pd.Timestamp(start)]
+        return trim_to_period(data, period, interval)
@@ -0,0 +1,33 @@
+from flask import Flask, redirect
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.serving import run_simple
+import webbrowser
+import threading
+
+# Function to build the buy and sell pages as one WSGI app. Both strategies read the same market data,
+# so every symbol is downloaded and its indicators computed once per refresh however many pages watch
+# it. The page modules (and pandas behind them) are imported here, not when this module is, and the
+# last saved snapshot is served until the first background refresh lands (warm=False starts cold).
+# For a WSGI server: gunicorn 'entry_app:create_app()'
+def create_app(warm=True):
+    import buy_entry
+    import sell_entry
+    from metrics import metrics
+
+    root = Flask(__name__)
+    metrics.install(root)
+
+    # Route for the root: the buy side page
+    @root.route('/')
+    def home():
+        return redirect('/buy/')
+
+    return DispatcherMiddleware(root, {'/buy': buy_entry.create_app(warm), '/sell': sell_entry.create_app(warm)})
+
+# Function to open the web browser
+def open_browser():
+    webbrowser.open_new("http://127.0.0.1:5000/")
+
+if __name__ == '__main__':
+    threading.Timer(1, open_browser).start()
+    run_simple('0.0.0.0', 5000, create_app(), threaded=True)
@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import bar_cache
+from bar_store import INTRADAY_SESSIONS
+from metrics import metrics
+
+# One (symbol, interval, period) download
+FetchRequest = namedtuple('FetchRequest', ['symbol', 'interval', 'period'])
+
+# Max in-flight downloads per data source name, anything not listed uses default_limit.
+# The chart client rate-limits and pools connections itself, so it only needs enough threads to keep it busy.
+SOURCE_LIMITS = {'yfinance': 8, 'chart': 16}
+# Intraday 'Nd' periods are N trading sessions (see data_sources.trim_to_period)
+INTRADAY_PERIOD = f'{INTRADAY_SESSIONS}d'
+
+# Function to give the one daily history request a ticker's daily, weekly and monthly bars all come from
+def daily_request(ticker_symbol):
+    return FetchRequest(ticker_symbol, '1d', 'max')
+
+# Function to give the 5-minute request behind a ticker's RSI table: INTRADAY_SESSIONS sessions, kept in
+# the bar cache so each refresh only downloads bars after the last cached one
+def intraday_request(ticker_symbol):
+    return FetchRequest(ticker_symbol, '5m', INTRADAY_PERIOD)
+
+# Function to list the bar requests one ticker needs for the page
+def page_requests(ticker_symbol):
+    return [intraday_request(ticker_symbol), daily_request(ticker_symbol)]
+
+# Runs bar requests concurrently on a bounded thread pool
+class FetchScheduler:
+    def __init__(self, max_workers=16, source_limits=None, default_limit=4,
+                 timeout=20, retries=2, backoff=0.5, fetch=None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch')
+        self.source_limits = dict(SOURCE_LIMITS if source_limits is None else source_limits)
+        self.default_limit = default_limit
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.fetch = fetch or bar_cache.get_bars
+        self.semaphores = {}
+        self.lock = threading.Lock()
+
+    def _semaphore(self, source_name):
+        with self.lock:
+            if source_name not in self.semaphores:
+                limit = self.source_limits.get(source_name, self.default_limit)
+                self.semaphores[source_name] = threading.BoundedSemaphore(limit)
+            return self.semaphores[source_name]
+
+    # Fetch one request, retrying with exponential backoff on errors
+    def _run(self, request):
+        semaphore = self._semaphore(bar_cache.current_source().name)
+        attempt = 0
+        while True:
+            try:
+                with semaphore, metrics.timer('fetch', symbol=request.symbol, interval=request.interval):
+                    return self.fetch(request.symbol, request.interval, request.period, timeout=self.timeout)
+            except Exception:
+                if attempt >= self.retries:
+                    raise
+                time.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+
+    # Yield (request, data, error) tuples in completion order
+    def fetch_iter(self, requests):
+        futures = {self.executor.submit(self._run, request): request for request in set(requests)}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], (None if error else future.result()), error
+
+    # Fetch all requests and return {request: data}, raising the first error unless told not to
+    def fetch_all(self, requests, raise_errors=True):
+        results = {}
+        for request, data, error in self.fetch_iter(requests):
+            if error is not None and raise_errors:
+                raise error
+            results[request] = data
+        return results
+
+default_scheduler = None
+
+# Function to fetch requests through the shared scheduler
+def fetch_all(requests, raise_errors=True):
+    global default_scheduler
+    if default_scheduler is None:
+        default_scheduler = FetchScheduler()
+    return default_scheduler.fetch_all(requests, raise_errors=raise_errors)
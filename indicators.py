@@ -0,0 +1,226 @@
+import copy
+import math
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = ['SMA', 'StdDev', 'UpperBand', 'LowerBand', 'RSI']
+
+# Function to calculate RSI
+def calculate_rsi(data, window=23):
+    delta = data['Close'].diff(1)
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.rolling(window=window).mean()
+    avg_loss = loss.rolling(window=window).mean()
+    rs = avg_gain / avg_loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+# Function to calculate Bollinger Bands
+def calculate_bollinger_bands(data, window=20, num_std_dev=2):
+    data['SMA'] = data['Close'].rolling(window=window).mean()
+    data['StdDev'] = data['Close'].rolling(window=window).std()
+    data['UpperBand'] = data['SMA'] + (num_std_dev * data['StdDev'])
+    data['LowerBand'] = data['SMA'] - (num_std_dev * data['StdDev'])
+    return data
+
+# Function to calculate RSI and Bollinger Bands on 5-minute data
+def calculate_5min_rsi_bollinger(data_5min):
+    data_5min = calculate_bollinger_bands(data_5min)
+    data_5min['RSI'] = calculate_rsi(data_5min)
+    return data_5min
+
+# Function to calculate the latest daily, weekly, and monthly RSI
+def calculate_rsi_levels(daily_data, weekly_data, monthly_data):
+    daily_rsi = calculate_rsi(daily_data).iloc[-1]
+    weekly_rsi = calculate_rsi(weekly_data).iloc[-1]
+    monthly_rsi = calculate_rsi(monthly_data).iloc[-1]
+    return daily_rsi, weekly_rsi, monthly_rsi
+
+# Rolling mean over a window with Kahan-compensated add/remove, as in pandas' roll_mean
+class RollingMean:
+    def __init__(self):
+        self.nobs = 0
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_run = 0
+        self.prev = math.nan
+
+    def add(self, value):
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+        self.same_run = self.same_run + 1 if value == self.prev else 1
+        self.prev = value
+
+    def remove(self, value):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.comp_remove
+        t = self.total + y
+        self.comp_remove = t - self.total - y
+        self.total = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+    def result(self, min_periods):
+        if self.nobs < min_periods or self.nobs == 0:
+            return math.nan
+        # Runs of identical values give that value exactly instead of a float artifact
+        if self.same_run >= self.nobs:
+            return self.prev
+        result = self.total / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+# Rolling RSI and Bollinger Band state for one series, updated in O(1) per bar.
+# Mirrors calculate_rsi / calculate_bollinger_bands: simple rolling means, sample std (ddof=1).
+class IncrementalIndicators:
+    def __init__(self, rsi_window=23, bb_window=20, num_std_dev=2):
+        self.rsi_window = rsi_window
+        self.bb_window = bb_window
+        self.num_std_dev = num_std_dev
+        self.gains = deque()
+        self.losses = deque()
+        self.closes = deque()
+        self.prev_close = None
+        self.gain_mean = RollingMean()
+        self.loss_mean = RollingMean()
+        self.close_mean = RollingMean()
+        self.undo = None
+
+    # Append a bar close and return (sma, std, upper_band, lower_band, rsi); NaN until windows fill
+    def update(self, close):
+        saved = (self.prev_close, copy.copy(self.gain_mean), copy.copy(self.loss_mean), copy.copy(self.close_mean))
+
+        # diff(1) is NaN on the first bar and after a NaN close; where(...) turns that into 0
+        delta = close - self.prev_close if self.prev_close is not None else math.nan
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else -0.0
+
+        # Like pandas, drop the value leaving the window before adding the new one
+        evicted_gain = evicted_loss = evicted_close = None
+        if len(self.gains) == self.rsi_window:
+            evicted_gain = self.gains.popleft()
+            evicted_loss = self.losses.popleft()
+            self.gain_mean.remove(evicted_gain)
+            self.loss_mean.remove(evicted_loss)
+        if len(self.closes) == self.bb_window:
+            evicted_close = self.closes.popleft()
+            self.close_mean.remove(evicted_close)
+        self.gains.append(gain)
+        self.losses.append(loss)
+        self.closes.append(close)
+        self.gain_mean.add(gain)
+        self.loss_mean.add(loss)
+        self.close_mean.add(close)
+
+        self.prev_close = close
+        self.undo = (saved, evicted_gain, evicted_loss, evicted_close)
+        return self.values()
+
+    # Undo the last update, e.g. to replace a still-forming bar with its revised close
+    def revert(self):
+        saved, evicted_gain, evicted_loss, evicted_close = self.undo
+        self.gains.pop()
+        self.losses.pop()
+        self.closes.pop()
+        if evicted_gain is not None:
+            self.gains.appendleft(evicted_gain)
+            self.losses.appendleft(evicted_loss)
+        if evicted_close is not None:
+            self.closes.appendleft(evicted_close)
+        self.prev_close, self.gain_mean, self.loss_mean, self.close_mean = saved
+        self.undo = None
+
+    # Sample std of the closes in the ring buffer; a two-pass sum over a fixed window is O(1) per bar
+    # and avoids the drift a running sum of squares picks up over a long session
+    def _std(self):
+        if self.close_mean.same_run >= self.close_mean.nobs:
+            return 0.0
+        values = [close for close in self.closes if close == close]
+        mean = math.fsum(values) / len(values)
+        return math.sqrt(math.fsum((close - mean) ** 2 for close in values) / (len(values) - 1))
+
+    # Current (sma, std, upper_band, lower_band, rsi)
+    def values(self):
+        sma = self.close_mean.result(self.bb_window)
+        std = self._std() if sma == sma and self.bb_window > 1 else math.nan
+        avg_gain = self.gain_mean.result(self.rsi_window)
+        avg_loss = self.loss_mean.result(self.rsi_window)
+        if avg_loss != 0:
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        elif avg_gain > 0:
+            rsi = 100.0
+        else:
+            rsi = math.nan
+        return (sma, std, sma + self.num_std_dev * std, sma - self.num_std_dev * std, rsi)
+
+# Per-symbol indicator state that extends previously computed columns with new bars only. Each symbol
+# keeps its indicator columns in one preallocated array (grown by doubling) and a refresh writes just
+# the bars after the last one seen, plus that last bar again since it may have been revised.
+class IndicatorEngine:
+    def __init__(self, rsi_window=23, bb_window=20, num_std_dev=2, capacity=1024):
+        self.params = {'rsi_window': rsi_window, 'bb_window': bb_window, 'num_std_dev': num_std_dev}
+        self.capacity = capacity
+        self.states = {}
+        self.lock = threading.Lock()
+
+    # Return data with SMA/StdDev/UpperBand/LowerBand/RSI added, computing only bars not seen before
+    def update(self, symbol, data):
+        with self.lock:
+            state = self.states.get(symbol)
+            index = data.index
+            # Resume only if the frame starts where the state started and still contains the last bar seen
+            if state is None or len(index) == 0 or index[0] != state['first'] \
+                    or state['length'] > len(index) or index[state['length'] - 1] != state['last']:
+                state = {'indicators': IncrementalIndicators(**self.params), 'length': 0,
+                         'columns': np.empty((len(INDICATOR_COLUMNS), max(self.capacity, len(index)))),
+                         'first': index[0] if len(index) else None, 'last': None}
+                self.states[symbol] = state
+            else:
+                state['indicators'].revert()
+                state['length'] -= 1
+
+            start = state['length']
+            if len(index) > state['columns'].shape[1]:
+                grown = np.empty((len(INDICATOR_COLUMNS), max(len(index), 2 * state['columns'].shape[1])))
+                grown[:, :start] = state['columns'][:, :start]
+                state['columns'] = grown
+            columns = state['columns']
+            indicators = state['indicators']
+            for position, close in enumerate(data['Close'].iloc[start:].tolist(), start):
+                columns[:, position] = indicators.update(close)
+            state['length'] = len(index)
+            state['last'] = index[-1] if len(index) else None
+
+            # The caller gets its own copy of the columns: the next update rewrites the last one in place
+            return pd.concat([data, pd.DataFrame(columns[:, :len(index)].T.copy(), index=index,
+                                                 columns=INDICATOR_COLUMNS)], axis=1)
+
+    def reset(self, symbol=None):
+        with self.lock:
+            if symbol is None:
+                self.states.clear()
+            else:
+                self.states.pop(symbol, None)
+
+engine = IndicatorEngine()
+
+# Function to add the 5-minute indicator columns through the shared incremental engine
+def update_indicators(symbol, data):
+    return engine.update(symbol, data)
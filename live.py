@@ -0,0 +1,215 @@
+import json
+import queue
+import threading
+import numpy as np
+import pandas as pd
+from flask import Response
+from metrics import metrics
+from page import PAGE_ROWS, daily_rsi_class
+from panel import has_earlier, session_index, window_panel
+from signals import position_sizing
+
+# Columns whose change makes a table row worth re-sending
+DELTA_COLUMNS = ['Signal', 'RSI', 'Close']
+HEARTBEAT_SECONDS = 15
+# Updates a slow client may fall behind by before its backlog is collapsed into one catch-up
+CLIENT_QUEUE_SIZE = 8
+# Most rows one /rows request may ask for
+MAX_PAGE_ROWS = 500
+
+# One refresh as seen by the push stream: the new snapshot, the 5-minute bars that are new or
+# changed per symbol (None: send everything after the client's last bar), and the symbols whose
+# series restarted (new session) so tables must reload. Rows are formatted once per distinct
+# watchlist and shared by every client watching it; clients only size positions themselves.
+class BarUpdate:
+    def __init__(self, snapshot, changed=None, reset=frozenset()):
+        self.snapshot = snapshot
+        self.changed = changed
+        self.reset = reset
+        self.memo = {}
+        self.lock = threading.Lock()
+
+    def values(self, ticker_symbols):
+        key = tuple(ticker_symbols)
+        with self.lock:
+            if key not in self.memo:
+                timestamps = session_index(self.snapshot.data_5min_all, ticker_symbols)
+                changed = [self.changed[t] for t in ticker_symbols if t in self.changed]
+                timestamps = timestamps[timestamps.isin(changed[0].append(changed[1:]))] if changed else timestamps[:0]
+                self.memo[key] = (timestamps, table_values(self.snapshot, ticker_symbols, timestamps),
+                                  level_rows(self.snapshot, ticker_symbols))
+            return self.memo[key]
+
+# Function to find, per symbol, the bars added or revised between two snapshots.
+# Only bars from the previous last bar onwards are compared, so the work is O(new bars).
+def bar_update(previous, current):
+    changed, reset = {}, set()
+    for ticker_symbol, data in current.data_5min_all.items():
+        old = previous.data_5min_all.get(ticker_symbol) if previous is not None else None
+        if old is None or old.empty or data.empty or data.times[0] != old.times[0]:
+            reset.add(ticker_symbol)
+            continue
+        tail = np.flatnonzero(data.times >= old.times[-1])
+        before = old.align(data.index[tail])
+        differs = np.zeros(len(tail), dtype=bool)
+        for column in DELTA_COLUMNS:
+            differs |= data[column][tail] != before[column]
+        changed[ticker_symbol] = data.index[tail[differs]]
+    return BarUpdate(current, changed, frozenset(reset))
+
+# Fans refresh updates out to every connected stream through small per-client queues, so a
+# slow browser never blocks the refresh job or other clients
+class Broadcaster:
+    def __init__(self, queue_size=CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        client = queue.Queue(maxsize=self.queue_size)
+        with self.lock:
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def client_count(self):
+        with self.lock:
+            return len(self.clients)
+
+    def publish(self, update):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.put_nowait(update)
+            except queue.Full:
+                # Drop the backlog; None tells the stream to catch up from the latest snapshot
+                while True:
+                    try:
+                        client.get_nowait()
+                    except queue.Empty:
+                        break
+                client.put_nowait(BarUpdate(update.snapshot, None, update.reset))
+
+# Function to format one symbol's column of table values: signals, closes and display strings
+# (RSI None where the close is NaN, i.e. the symbol has no bar)
+def value_column(signal, close, rsi):
+    return (signal, close, [None if c != c else '%.2f' % r for r, c in zip(rsi.tolist(), close.tolist())],
+            ['%.2f' % c for c in close.tolist()])
+
+# Function to pull the capital-independent part of a user's table at the given bars: time labels
+# and, per symbol, signals, closes and display strings (None where that symbol has no bar)
+def table_values(snapshot, ticker_symbols, timestamps):
+    columns = []
+    for ticker_symbol in ticker_symbols:
+        data = snapshot.data_5min_all[ticker_symbol].align(timestamps)
+        columns.append(value_column(data['Signal'], data['Close'].astype(float), data['RSI']))
+    return [timestamp.strftime('%Y-%m-%d %H:%M') for timestamp in timestamps], columns
+
+# Function to size and lay out table rows as [time label, cells] pairs. A cell is
+# [signal, rsi, price, sl, qty, target] as display strings (SL/Qty/Target None when not sized),
+# or None when that symbol has no bar at the time.
+def table_rows(values, user_capital, user_risk, rules):
+    labels, columns = values
+    sized = []
+    for signal, close, rsi_text, close_text in columns:
+        stop_loss, qty, target_price = position_sizing(close, signal, user_capital, user_risk, rules)
+        sized.append([None if rsi is None else
+                      [signal_value, rsi, price] +
+                      (['%.2f' % sl, '%.2f' % q, '%.2f' % target] if signal_value and q == q else [None] * 3)
+                      for signal_value, rsi, price, sl, q, target in
+                      zip(signal.tolist(), rsi_text, close_text,
+                          stop_loss.tolist(), qty.tolist(), target_price.tolist())])
+    return [[label, list(cells)] for label, cells in zip(labels, zip(*sized))]
+
+# Function to format the level rows (day/week/month RSI) of a user's table
+def level_rows(snapshot, ticker_symbols):
+    return [['%.2f' % daily_rsi, daily_rsi_class(daily_rsi), '%.2f' % weekly_rsi, '%.2f' % monthly_rsi]
+            for daily_rsi, weekly_rsi, monthly_rsi in (snapshot.rsi_levels[t] for t in ticker_symbols)]
+
+# Function to format one Server-Sent Event
+def sse_event(event, data, event_id=None):
+    lines = f'id: {event_id}\n' if event_id is not None else ''
+    return f'{lines}event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+# Function to read the last bar a client already has (epoch seconds) from ?after= or Last-Event-ID
+def parse_after(value):
+    try:
+        return pd.Timestamp(float(value), unit='s', tz='UTC')
+    except (TypeError, ValueError):
+        return None
+
+# Generator behind /stream: catches the client up from `after`, then sends only new or changed
+# rows of its own table as each refresh lands; comment lines keep idle connections alive
+def event_stream(broadcaster, snapshots, ticker_symbols, user_capital, user_risk, rules, after=None):
+    client = broadcaster.subscribe()
+    try:
+        update = BarUpdate(snapshots.get())
+        session_start = None
+        while True:
+            snapshot = update.snapshot
+            if any(t not in snapshot.data_5min_all for t in ticker_symbols):
+                yield sse_event('reset', {})
+                return
+            timestamps = session_index(snapshot.data_5min_all, ticker_symbols)
+            if session_start is None:
+                session_start = timestamps[0] if len(timestamps) else None
+            elif update.reset.intersection(ticker_symbols) or (len(timestamps) and timestamps[0] != session_start):
+                yield sse_event('reset', {})
+                return
+            if update.changed is None:
+                # A client that has no bars yet gets the page's window, not the whole history
+                timestamps = timestamps[timestamps >= after] if after is not None else timestamps[-PAGE_ROWS:]
+                values, levels = table_values(snapshot, ticker_symbols, timestamps), level_rows(snapshot, ticker_symbols)
+            else:
+                timestamps, values, levels = update.values(ticker_symbols)
+            if len(timestamps):
+                after = timestamps[-1]
+                yield sse_event('bars', {'time': snapshot.built_at,
+                                         'rows': table_rows(values, user_capital, user_risk, rules),
+                                         'levels': levels},
+                                event_id=int(after.timestamp()))
+            while True:
+                try:
+                    update = client.get(timeout=HEARTBEAT_SECONDS)
+                    break
+                except queue.Empty:
+                    yield ': ping\n\n'
+    finally:
+        broadcaster.unsubscribe(client)
+
+# Function to open the push stream for one browser session
+def stream_response(broadcaster, snapshots, ticker_symbols, user_capital, user_risk, rules, after=None):
+    return Response(event_stream(broadcaster, snapshots, ticker_symbols, user_capital, user_risk, rules,
+                                 parse_after(after)),
+                    mimetype='text/event-stream', headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Function to lay out the `limit` table rows before `before` (epoch seconds; None for the latest) the way
+# the stream does. Returns (rows, epoch seconds of the first row if there are earlier bars, else None).
+def history_rows(snapshot, ticker_symbols, user_capital, user_risk, rules, before=None, limit=PAGE_ROWS):
+    panel = window_panel(snapshot.data_5min_all, ticker_symbols, limit,
+                         None if before is None else before.as_unit('ns').value)
+    columns = [value_column(panel['Signal'][:, i], panel['Close'][:, i].astype(float), panel['RSI'][:, i])
+               for i in range(len(ticker_symbols))]
+    rows = table_rows(([timestamp.strftime('%Y-%m-%d %H:%M') for timestamp in panel.index], columns),
+                      user_capital, user_risk, rules)
+    earlier = len(panel) and has_earlier(snapshot.data_5min_all, ticker_symbols, panel.times[0])
+    return rows, int(panel.index[0].timestamp()) if earlier else None
+
+# Function to answer /rows: one page of earlier table rows for the browser to prepend as the user scrolls
+# back, so the page itself only ever carries one window however much history is loaded
+def rows_response(snapshot, ticker_symbols, user_capital, user_risk, rules, before=None, limit=None):
+    try:
+        limit = min(max(int(limit), 1), MAX_PAGE_ROWS) if limit else PAGE_ROWS
+    except ValueError:
+        return Response(json.dumps({'error': f'Invalid limit: {limit}'}), status=400, mimetype='application/json')
+    start = parse_after(before)
+    if before and pd.isna(start):
+        return Response(json.dumps({'error': f'Invalid before: {before}'}), status=400, mimetype='application/json')
+    with metrics.timer('rows'):
+        rows, earlier = history_rows(snapshot, ticker_symbols, user_capital, user_risk, rules, start, limit)
+        body = json.dumps({'rows': rows, 'before': earlier}, separators=(',', ':'))
+    return Response(body, mimetype='application/json')
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import threading
+import time
+import pandas as pd
+from data_sources import BAR_COLUMNS, INTRADAY_INTERVALS, DataSource
+from metrics import metrics
+
+# Yahoo's chart API; point MARKET_DATA_URL at a stand-in server (benchmarks/chart_server.py) to work offline
+MARKET_DATA_URL = os.environ.get('MARKET_DATA_URL', 'https://query2.finance.yahoo.com')
+# Requests per second across every symbol, and how many may go out back to back
+RATE_LIMIT = float(os.environ.get('MARKET_DATA_RATE', 10))
+RATE_BURST = 10
+# Connections kept open to the provider
+MAX_CONNECTIONS = 16
+# Browser the TLS fingerprint and headers imitate, as yfinance does, so the provider doesn't refuse us
+IMPERSONATE = 'chrome'
+
+# Token bucket shared by every download: at most `burst` at once, `rate` per second sustained
+class RateLimiter:
+    def __init__(self, rate=RATE_LIMIT, burst=RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = None
+
+    async def acquire(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# Function to build the chart API query for a period ('1d', '5y', 'max') or everything since start
+def chart_params(interval, period=None, start=None):
+    params = {'interval': interval, 'includePrePost': 'false', 'events': 'div,splits'}
+    if start is not None:
+        params['period1'] = int(pd.Timestamp(start).timestamp())
+        params['period2'] = int(time.time()) + 60
+    else:
+        params['range'] = period or 'max'
+    return params
+
+# Function to read one numeric array of a chart API response as floats, missing values NaN
+def chart_values(values):
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+
+# Function to turn a chart API response into OHLCV bars indexed like yfinance's: in the exchange's
+# timezone, daily and longer bars at midnight, rows without prices dropped. Prices are split and dividend
+# adjusted like yfinance's auto_adjust: Close is adjclose and Open/High/Low are scaled by adjclose/close.
+def parse_chart(payload, interval):
+    result = (payload.get('chart') or {}).get('result') or [None]
+    result = result[0]
+    if not result or not result.get('timestamp'):
+        return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([]))
+    quote = result['indicators']['quote'][0]
+    index = pd.to_datetime(result['timestamp'], unit='s', utc=True).as_unit('ns').tz_convert(
+        result['meta'].get('exchangeTimezoneName') or 'UTC')
+    if interval not in INTRADAY_INTERVALS:
+        index = index.normalize()
+    data = pd.DataFrame({column: chart_values(quote.get(column.lower())) for column in BAR_COLUMNS}, index=index)
+    adjclose = (result['indicators'].get('adjclose') or [{}])[0].get('adjclose')
+    if adjclose is not None:
+        ratio = chart_values(adjclose) / data['Close'].to_numpy()
+        for column in ('Open', 'High', 'Low', 'Close'):
+            data[column] = data[column].to_numpy() * ratio
+    data = data.dropna(how='all', subset=['Open', 'High', 'Low', 'Close'])
+    return data[~data.index.duplicated(keep='last')]
+
+# asyncio market-data client: one pooled keep-alive session, one download per distinct request however
+# many callers ask for it at the same time (single-flight), and a global rate limit
+class MarketDataClient:
+    def __init__(self, base_url=MARKET_DATA_URL, rate=RATE_LIMIT, burst=RATE_BURST,
+                 max_connections=MAX_CONNECTIONS, timeout=20, impersonate=IMPERSONATE):
+        self.base_url = base_url.rstrip('/')
+        self.limiter = RateLimiter(rate, burst)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.impersonate = impersonate
+        self.session = None
+        self.in_flight = {}
+
+    def get_session(self):
+        if self.session is None:
+            # Imported with the first download rather than at startup
+            from curl_cffi.requests import AsyncSession
+            self.session = AsyncSession(max_clients=self.max_connections, impersonate=self.impersonate)
+        return self.session
+
+    async def history(self, symbol, interval, period=None, start=None, timeout=None):
+        key = (symbol, interval, period, None if start is None else pd.Timestamp(start).value)
+        task = self.in_flight.get(key)
+        if task is None:
+            metrics.count('market_data_requests', result='download')
+            task = self.in_flight[key] = asyncio.ensure_future(self.download(symbol, interval, period, start, timeout))
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        else:
+            metrics.count('market_data_requests', result='coalesced')
+        # shield: a caller that gives up must not cancel the download for the others; each gets its own copy
+        return (await asyncio.shield(task)).copy()
+
+    async def download(self, symbol, interval, period, start, timeout):
+        await self.limiter.acquire()
+        with metrics.timer('http', interval=interval):
+            response = await self.get_session().get(f'{self.base_url}/v8/finance/chart/{symbol}',
+                                                    params=chart_params(interval, period, start),
+                                                    timeout=timeout or self.timeout)
+        # Unknown symbols come back as 404 with an error body; like yfinance, that is no bars
+        if response.status_code == 404:
+            return pd.DataFrame(columns=BAR_COLUMNS, index=pd.DatetimeIndex([]))
+        response.raise_for_status()
+        return parse_chart(response.json(), interval)
+
+    # Download many (symbol, interval, period) requests concurrently; returns {request: bars or exception}
+    async def fetch_many(self, requests):
+        results = await asyncio.gather(*(self.history(request.symbol, request.interval, request.period)
+                                         for request in requests), return_exceptions=True)
+        return dict(zip(requests, results))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+# Data source running a MarketDataClient on its own event loop thread, so the bar cache and the
+# fetch scheduler's worker threads all share one connection pool, single-flight map and rate limit
+class ChartSource(DataSource):
+    name = 'chart'
+
+    def __init__(self, base_url=MARKET_DATA_URL, **options):
+        self.client = MarketDataClient(base_url, **options)
+        self.loop = None
+        self.lock = threading.Lock()
+
+    def get_loop(self):
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name='market-data', daemon=True).start()
+            return self.loop
+
+    def history(self, symbol, interval, period=None, start=None, timeout=None):
+        future = asyncio.run_coroutine_threadsafe(self.client.history(symbol, interval, period, start, timeout),
+                                                  self.get_loop())
+        return future.result()
+
+    def close(self):
+        if self.loop is not None:
+            asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.loop = None
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from flask import Response, g, has_request_context, request
+
+# Set METRICS_ENABLED=0 to turn every timer into a no-op
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+PREFIX = 'easyentry'
+
+# Function to format labels as Prometheus expects them: {name="value",...}
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+# Times one stage; a plain class rather than a generator context manager keeps the overhead to two clock reads
+class Timer:
+    __slots__ = ('metrics', 'stage', 'labels', 'start')
+
+    def __init__(self, metrics, stage, labels):
+        self.metrics = metrics
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start, self.labels)
+        return False
+
+# Does nothing, for when metrics are switched off
+class NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_TIMER = NullTimer()
+
+# Process-wide hot-path metrics: stage timings (count and total seconds), counters and gauges read at
+# scrape time. Stages timed on a request's own thread also go into that response's Server-Timing header.
+class Metrics:
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.timings = {}
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+
+    def timer(self, stage, **labels):
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, stage, tuple(sorted(labels.items())))
+
+    def observe(self, stage, seconds, labels=()):
+        if not self.enabled:
+            return
+        key = (stage, labels)
+        with self.lock:
+            entry = self.timings.get(key)
+            if entry is None:
+                entry = self.timings[key] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += seconds
+        if has_request_context():
+            timings = g.get('server_timing')
+            if timings is not None:
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    # Register a gauge; read() returns {labels dict as tuple of pairs: value}
+    def gauge(self, name, help_text, read):
+        with self.lock:
+            self.gauges[name] = (help_text, read)
+
+    # Everything in Prometheus text exposition format
+    def render(self):
+        with self.lock:
+            timings = sorted(self.timings.items())
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+        lines = [f'# HELP {PREFIX}_stage_seconds Time spent in each hot-path stage',
+                 f'# TYPE {PREFIX}_stage_seconds summary']
+        for (stage, labels), (count, total) in timings:
+            label_text = format_labels((('stage', stage),) + labels)
+            lines.append(f'{PREFIX}_stage_seconds_count{label_text} {count}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{label_text} {total:.6f}')
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f'# TYPE {PREFIX}_{name}_total counter')
+                typed.add(name)
+            lines.append(f'{PREFIX}_{name}_total{format_labels(labels)} {value}')
+        for name, (help_text, read) in gauges:
+            lines += [f'# HELP {PREFIX}_{name} {help_text}', f'# TYPE {PREFIX}_{name} gauge']
+            for labels, value in sorted(read().items()):
+                lines.append(f'{PREFIX}_{name}{format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    # Function to add the /metrics route and the per-request Server-Timing header to a Flask app
+    def install(self, app):
+        @app.before_request
+        def start_timing():
+            if self.enabled:
+                g.server_timing = {}
+                g.request_start = time.perf_counter()
+
+        @app.after_request
+        def add_server_timing(response):
+            timings = g.get('server_timing')
+            if timings is None:
+                return response
+            total = time.perf_counter() - g.request_start
+            self.observe('request', total, (('endpoint', request.endpoint or ''),))
+            # A streamed body is rendered after the headers go out, so its render time is only in /metrics
+            response.headers['Server-Timing'] = ', '.join(
+                [f'{stage};dur={seconds * 1e3:.2f}' for stage, seconds in timings.items() if stage != 'request'] +
+                [f'total;dur={total * 1e3:.2f}'])
+            return response
+
+        @app.route('/metrics')
+        def metrics_page():
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+        return app
+
+metrics = Metrics()
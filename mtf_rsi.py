@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+TIMEFRAMES = ['day', 'week', 'month']
+# Below this many symbols per worker the pool costs more than it saves: the vectorized pass takes a few
+# microseconds per symbol, shipping a chunk to a worker process tens of milliseconds
+MIN_SYMBOLS_PER_WORKER = 5000
+# Processes in the shared pool, sized once; callers only choose how many chunks they split work into
+POOL_WORKERS = int(os.environ.get('MTF_POOL_WORKERS') or os.cpu_count() or 1)
+
+# Function to compute the RSI series of a close array, same definition as calculate_rsi
+def rsi_series(close, window=23):
+    close = np.asarray(close, dtype=float)
+    rsi = np.full(len(close), np.nan)
+    if len(close) < window:
+        return rsi
+    delta = np.diff(close, prepend=np.nan)
+    avg_gain = sliding_window_view(np.where(delta > 0, delta, 0.0), window).mean(axis=1)
+    avg_loss = sliding_window_view(np.where(delta < 0, -delta, 0.0), window).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi[window - 1:] = 100 - (100 / (1 + avg_gain / avg_loss))
+    return rsi
+
+# Function to compute the latest RSI of every (row, timeframe) slice of a flat close buffer, all slices at
+# once: the latest value only depends on each slice's last `window` closes and the one before them
+def _latest_rsi(closes, slices, results, window):
+    slices = np.asarray(slices, dtype=np.int64).reshape(-1, 4)
+    slices = slices[slices[:, 3] - slices[:, 2] >= window]
+    if not len(slices):
+        return
+    # The last window + 1 closes of each slice; the first is missing (NaN, as diff gives) when the
+    # slice holds exactly `window` closes
+    positions = slices[:, 3, None] - (window + 1) + np.arange(window + 1)
+    tails = np.where(positions >= slices[:, 2, None], closes[np.maximum(positions, 0)], np.nan)
+    delta = np.diff(tails, axis=1)
+    avg_gain = np.where(delta > 0, delta, 0.0).mean(axis=1)
+    avg_loss = np.where(delta < 0, -delta, 0.0).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        results[slices[:, 0], slices[:, 1]] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+# Worker: attach to the shared close/result buffers by name and fill in its partition
+def _rsi_worker(closes_name, closes_size, results_name, results_shape, slices, window):
+    closes_block = shared_memory.SharedMemory(name=closes_name)
+    results_block = shared_memory.SharedMemory(name=results_name)
+    closes = results = None
+    try:
+        closes = np.ndarray((closes_size,), dtype=np.float64, buffer=closes_block.buf)
+        results = np.ndarray(results_shape, dtype=np.float64, buffer=results_block.buf)
+        _latest_rsi(closes, slices, results, window)
+    finally:
+        # Views must be released before the blocks close, or close() raises BufferError over the real error
+        del closes, results
+        closes_block.close()
+        results_block.close()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Function to return the process pool every caller shares (the refresh, request threads, the sweep).
+# It is created once with POOL_WORKERS processes and never torn down while in use, so no caller can
+# submit to a pool another one just shut down; spawn keeps workers clear of the server's threads.
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+# Function to compute latest day/week/month RSI for many symbols at once.
+# closes_by_symbol maps symbol -> {'day': closes, 'week': closes, 'month': closes}; returns a
+# (symbol x timeframe) DataFrame. Large universes are split across a process pool, with the bars
+# shipped through one shared-memory block instead of being pickled per task.
+def batch_rsi_levels(closes_by_symbol, window=23, workers=None):
+    symbols = list(closes_by_symbol)
+    arrays, slices, offset = [], [], 0
+    for row, symbol in enumerate(symbols):
+        for column, timeframe in enumerate(TIMEFRAMES):
+            values = np.asarray(closes_by_symbol[symbol].get(timeframe, ()), dtype=np.float64)
+            arrays.append(values)
+            slices.append((row, column, offset, offset + len(values)))
+            offset += len(values)
+    results_shape = (len(symbols), len(TIMEFRAMES))
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(symbols) // MIN_SYMBOLS_PER_WORKER))
+    if workers <= 1:
+        results = np.full(results_shape, np.nan)
+        _latest_rsi(np.concatenate(arrays) if arrays else np.empty(0), slices, results, window)
+        return pd.DataFrame(results, index=pd.Index(symbols, name='Symbol'), columns=TIMEFRAMES)
+
+    closes_block = shared_memory.SharedMemory(create=True, size=max(offset, 1) * 8)
+    results_block = shared_memory.SharedMemory(create=True, size=max(len(symbols), 1) * len(TIMEFRAMES) * 8)
+    closes = results = None
+    try:
+        closes = np.ndarray((offset,), dtype=np.float64, buffer=closes_block.buf)
+        np.concatenate(arrays, out=closes)
+        results = np.ndarray(results_shape, dtype=np.float64, buffer=results_block.buf)
+        results[:] = np.nan
+        # Contiguous symbol ranges, a few per worker so uneven histories balance out; workers only
+        # sets how many chunks there are, the pool's size is fixed
+        chunks = np.array_split(np.arange(len(slices)), workers * 4)
+        futures = [get_pool().submit(_rsi_worker, closes_block.name, offset, results_block.name, results_shape,
+                                     [slices[i] for i in chunk], window)
+                   for chunk in chunks if len(chunk)]
+        for future in futures:
+            future.result()
+        return pd.DataFrame(results.copy(), index=pd.Index(symbols, name='Symbol'), columns=TIMEFRAMES)
+    finally:
+        # Views must be released before the blocks close, or close() raises BufferError over the real error
+        del closes, results
+        closes_block.close()
+        closes_block.unlink()
+        results_block.close()
+        results_block.unlink()
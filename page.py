@@ -0,0 +1,59 @@
+import time
+from flask import render_template
+from metrics import metrics
+from panel import SESSION_BARS, has_earlier, window_panel
+from signals import position_sizing
+from snapshot import snapshot_age
+
+PAGE_TEMPLATE = 'rsi_page.html'
+# Table rows the page is served with, the latest ones; earlier rows are fetched a page at a time from /rows
+PAGE_ROWS = SESSION_BARS
+
+# Function to pick the highlight class for the daily RSI level
+def daily_rsi_class(daily_rsi):
+    return 'highlight-low' if daily_rsi < 40 else 'highlight-mid' if 40 <= daily_rsi <= 60 else 'highlight-high'
+
+# Function to yield RSI table rows lazily, so they are formatted while the response streams.
+# columns are (time x symbol) nested lists of Signal, RSI, Close, StopLoss, Qty, Target; a gap has RSI NaN.
+def rsi_rows(timestamps, columns):
+    for timestamp, *row in zip(timestamps, *columns):
+        yield timestamp.strftime('%Y-%m-%d %H:%M'), zip(*row)
+
+# Function to collect everything the page template needs from a strategy's snapshot
+def page_context(snapshot, page, rules, ticker_symbols, user_capital, user_risk, error_message='',
+                 page_rows=PAGE_ROWS):
+    with metrics.timer('html'):
+        rsi_levels = []
+        for ticker_symbol in ticker_symbols:
+            daily_rsi, weekly_rsi, monthly_rsi = snapshot.rsi_levels[ticker_symbol]
+            rsi_levels.append({'ticker_symbol': ticker_symbol, 'daily': daily_rsi, 'daily_class': daily_rsi_class(daily_rsi),
+                               'weekly': weekly_rsi, 'monthly': monthly_rsi})
+
+        # The latest page_rows slots of the session grid (missing bars are gaps), sized in one pass over
+        # the (time x symbol) panel; the template only formats. However many sessions are loaded, the
+        # page carries one window and the browser asks /rows for earlier ones.
+        rows = []
+        stream_after = page_before = ''
+        if ticker_symbols:
+            panel = window_panel(snapshot.data_5min_all, ticker_symbols, page_rows)
+            close = panel['Close'].astype(float)
+            signal = panel['Signal']
+            stop_loss, qty, target_price = (column.reshape(close.shape) for column in position_sizing(
+                close.ravel(), signal.ravel(), user_capital, user_risk, rules))
+            rows = rsi_rows(panel.index, [column.tolist() for column in (signal, panel['RSI'].astype(float), close,
+                                                                         stop_loss, qty, target_price)])
+            if len(panel):
+                stream_after = int(panel.index[-1].timestamp())
+                if has_earlier(snapshot.data_5min_all, ticker_symbols, panel.times[0]):
+                    page_before = int(panel.index[0].timestamp())
+
+        return {'page': page, 'ticker_symbols': ticker_symbols, 'user_capital': user_capital, 'user_risk': user_risk,
+                'error_message': error_message, 'rsi_levels': rsi_levels, 'rows': rows,
+                'snapshot_time': time.strftime('%H:%M:%S', time.localtime(snapshot.built_at)),
+                'snapshot_age': snapshot_age(snapshot), 'built_at': int(snapshot.built_at),
+                'stream_after': stream_after, 'page_before': page_before, 'page_rows': page_rows}
+
+# Function to render the page to a string
+def render_page(context):
+    with metrics.timer('render'):
+        return render_template(PAGE_TEMPLATE, **context)
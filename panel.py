@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# NSE cash session in exchange time: 75 five-minute bars opening 09:15 to 15:25
+SESSION_TZ = 'Asia/Kolkata'
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+SESSION_BARS = 75
+BAR_NS = 5 * 60 * 10 ** 9
+DAY_NS = 24 * 60 * 60 * 10 ** 9
+
+# Function to turn int64 epoch-ns times into a DatetimeIndex in the given timezone
+def times_index(times, tz):
+    index = pd.DatetimeIndex(np.asarray(times, dtype=np.int64).view('datetime64[ns]'))
+    return index.tz_localize('UTC').tz_convert(tz) if tz is not None else index
+
+# Function to lay the exchange's 5-minute session grid over sorted, unique bar times (int64 epoch ns):
+# for each day they fall on, every slot from that day's first bar to its last (bars before the
+# indicators warm up are not gaps). A bar off the grid (a provider's odd timestamp) is kept as a slot
+# of its own rather than dropped.
+def session_grid(times, tz=SESSION_TZ):
+    if not len(times):
+        return np.asarray(times, dtype=np.int64)
+    # Day arithmetic on exchange wall-clock nanoseconds; one timezone conversion, the rest is numpy
+    wall = times_index(times, tz).tz_localize(None).asi8 if tz is not None else times
+    days = wall // DAY_NS
+    first = np.flatnonzero(np.diff(days, prepend=days[0] - 1))
+    last = np.append(first[1:], len(times)) - 1
+    opens = days[first] * DAY_NS + SESSION_OPEN.value - (wall[first] - times[first])
+    slots = opens[:, None] + np.arange(SESSION_BARS) * BAR_NS
+    inside = (slots >= times[first][:, None]) & (slots <= times[last][:, None])
+    return np.union1d(slots[inside], times)
+
+# Several symbols' compact bars aligned on one session grid. values is one contiguous
+# (time x symbol x field) array, NaN where a symbol has no bar at a slot; present is False there (a gap)
+# and the signal code points at ''. Reads like CompactBars: panel.index, panel['Close'] (time x symbol).
+class Panel:
+    __slots__ = ('times', 'tz', 'ticker_symbols', 'fields', 'values', 'present', 'signal_codes', 'signal_labels',
+                 'cached_index')
+
+    def __init__(self, times, tz, ticker_symbols, fields, values, present, signal_codes, signal_labels):
+        self.times = times
+        self.tz = tz
+        self.ticker_symbols = tuple(ticker_symbols)
+        self.fields = fields
+        self.values = values
+        self.present = present
+        self.signal_codes = signal_codes
+        self.signal_labels = signal_labels
+        self.cached_index = None
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def index(self):
+        if self.cached_index is None:
+            self.cached_index = times_index(self.times, self.tz)
+        return self.cached_index
+
+    def __getitem__(self, name):
+        if name == 'Signal':
+            return self.signal_labels[self.signal_codes]
+        return self.values[:, :, self.fields.index(name)]
+
+    # The last n slots
+    def tail(self, n):
+        start = max(len(self.times) - n, 0)
+        return Panel(self.times[start:], self.tz, self.ticker_symbols, self.fields, self.values[start:],
+                     self.present[start:], self.signal_codes[start:], self.signal_labels)
+
+# Function to align symbols' compact bars on the session grid in one scatter: every bar's grid row is
+# found with a single searchsorted over all symbols at once, so the cost is O(bars log slots) with no
+# per-timestamp lookups, and a symbol missing a bar another one has becomes a gap instead of an error
+def build_panel(data_5min_all, ticker_symbols):
+    bars = [data_5min_all[ticker_symbol] for ticker_symbol in ticker_symbols]
+    fields = bars[0].fields if bars else ()
+    tz = bars[0].tz if bars else None
+    lengths = [len(data) for data in bars]
+    times = np.concatenate([data.times for data in bars]) if bars else np.empty(0, dtype=np.int64)
+    grid = session_grid(np.unique(times), tz)
+
+    rows = np.searchsorted(grid, times)
+    columns = np.repeat(np.arange(len(bars)), lengths)
+    dtype = np.result_type(*[data.values.dtype for data in bars]) if bars else np.float64
+    values = np.full((len(grid), len(bars), len(fields)), np.nan, dtype=dtype)
+    present = np.zeros((len(grid), len(bars)), dtype=bool)
+    present[rows, columns] = True
+    if len(times):
+        values[rows, columns] = np.concatenate([data.values.T for data in bars])
+
+    # One label table for every symbol's signals; '' sorts first, so code 0 marks no signal and gaps
+    labels = np.unique(np.concatenate([np.array([''])] + [data.signal_labels for data in bars]))
+    signal_codes = np.zeros((len(grid), len(bars)), dtype=np.int8)
+    if len(times):
+        signal_codes[rows, columns] = np.concatenate([
+            np.searchsorted(labels, data.signal_labels)[data.signal_codes] if data.signal_codes is not None
+            else np.zeros(len(data), dtype=np.int8) for data in bars])
+    return Panel(grid, tz, ticker_symbols, fields, values, present, signal_codes, labels)
+
+# Function to give the session grid of some symbols as a DatetimeIndex, without aligning their values
+def session_index(data_5min_all, ticker_symbols):
+    bars = [data_5min_all[ticker_symbol] for ticker_symbol in ticker_symbols]
+    tz = bars[0].tz if bars else None
+    times = np.unique(np.concatenate([data.times for data in bars])) if bars else np.empty(0, dtype=np.int64)
+    return times_index(session_grid(times, tz), tz)
+
+# Function to build only the panel of the last `rows` grid slots before `before` (epoch ns, exclusive;
+# None for the latest). No symbol has more than `rows` bars in those slots, so each symbol's last `rows`
+# bars before `before` cover them: the cost depends on rows, not on how much history is loaded.
+def window_panel(data_5min_all, ticker_symbols, rows, before=None):
+    window = {}
+    for ticker_symbol in ticker_symbols:
+        data = data_5min_all[ticker_symbol]
+        stop = len(data) if before is None else int(np.searchsorted(data.times, before))
+        window[ticker_symbol] = data.slice(max(stop - rows, 0), stop)
+    return build_panel(window, ticker_symbols).tail(rows)
+
+# Function to tell whether any of the symbols has a bar before `time` (epoch ns)
+def has_earlier(data_5min_all, ticker_symbols, time):
+    return any(len(data_5min_all[t]) and data_5min_all[t].times[0] < time for t in ticker_symbols)
@@ -0,0 +1,69 @@
+import threading
+import pandas as pd
+from data_sources import BAR_COLUMNS
+
+# How daily OHLCV bars combine into a longer bar
+OHLCV_AGGREGATION = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+RULES = ('week', 'month')
+
+# Function to label each daily bar with the start of its week (Monday) or month (the 1st).
+# Days are taken in the index's own timezone, i.e. the exchange calendar yfinance reports (IST for NSE),
+# and only trading days that exist in the data are grouped, so holidays simply drop out.
+def period_starts(index, rule):
+    days = index.normalize()
+    if rule == 'week':
+        return days - pd.to_timedelta(days.dayofweek, unit='D')
+    if rule == 'month':
+        return days - pd.to_timedelta(days.day - 1, unit='D')
+    raise ValueError(f'Unknown resample rule: {rule}')
+
+# Function to build weekly or monthly bars from daily bars, labelled like yfinance's 1wk/1mo bars
+def resample_bars(daily, rule):
+    if daily.empty:
+        return daily[BAR_COLUMNS].copy()
+    bars = daily[BAR_COLUMNS].groupby(period_starts(daily.index, rule)).agg(OHLCV_AGGREGATION)
+    bars.index.name = daily.index.name
+    return bars
+
+# Function to extend previously derived bars: closed periods are kept, only the live period onwards is rebuilt.
+# Closed periods are only kept while the daily history under them is unchanged: the day before the live
+# period must still close where the last closed period did. A re-downloaded history rescaled after a split
+# or dividend (see bar_cache) moves every earlier close, and then all periods are rebuilt.
+def update_resampled(previous, daily, rule):
+    if previous is None or previous.empty or daily.empty:
+        return resample_bars(daily, rule)
+    live_start = previous.index[-1]
+    if daily.index[0] > live_start:
+        return resample_bars(daily, rule)
+    if len(previous) > 1:
+        last_closed = daily.index.searchsorted(live_start) - 1
+        if last_closed < 0 or daily['Close'].iloc[last_closed] != previous['Close'].iloc[-2] \
+                or period_starts(daily.index[:1], rule)[0] != previous.index[0]:
+            return resample_bars(daily, rule)
+    tail = resample_bars(daily[daily.index >= live_start], rule)
+    return pd.concat([previous[previous.index < live_start], tail])
+
+# Derived weekly/monthly bars per symbol, updated incrementally as the daily series grows
+class ResampleCache:
+    def __init__(self):
+        self.bars = {}
+        self.lock = threading.Lock()
+
+    def get(self, symbol, daily, rule):
+        with self.lock:
+            previous = self.bars.get((symbol, rule))
+        bars = update_resampled(previous, daily, rule)
+        with self.lock:
+            self.bars[(symbol, rule)] = bars
+        return bars
+
+resampled = ResampleCache()
+
+# Function to derive weekly or monthly bars for a symbol from its cached daily history
+def derived_bars(symbol, daily, rule):
+    return resampled.get(symbol, daily, rule)
+
+# Function to give the day/week/month closes batch_rsi_levels expects, all from one daily series
+def timeframe_closes(symbol, daily):
+    return {'day': daily['Close'], 'week': derived_bars(symbol, daily, 'week')['Close'],
+            'month': derived_bars(symbol, daily, 'month')['Close']}
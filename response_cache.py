@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from flask import Response, request
+from metrics import metrics
+
+# brotli is optional; without it browsers get gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Rendered pages kept in memory, least recently used evicted first
+MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_ENTRIES', 256))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Function to list the encodings a body is stored in, best first
+def available_encodings():
+    return (['br'] if brotli is not None else []) + ['gzip', 'identity']
+
+# Function to compress a rendered body into every available encoding
+def encode_bodies(body):
+    data = body.encode('utf-8')
+    bodies = {'identity': data, 'gzip': gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(data, quality=BROTLI_QUALITY)
+    return bodies
+
+# Changes every time the process starts: a warm restart serves the saved snapshot under its old build
+# time, but the page (its age, or a new template) may differ, so ETags from before the restart never match
+GENERATION = secrets.token_hex(8)
+
+# Function to derive a strong ETag from the cache key and process generation, so a matching
+# If-None-Match is answered without looking up or rendering anything
+def key_etag(key):
+    return hashlib.blake2b(repr((GENERATION, key)).encode('utf-8'), digest_size=12).hexdigest()
+
+# Whole-page responses per (page inputs, snapshot): between bar closes every request with the same
+# tickers and capital/risk gets the same bytes, so the page is rendered and compressed once per
+# snapshot and then served from memory, or answered with 304 when the browser already has it
+class ResponseCache:
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.pages = OrderedDict()
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    # Return a page's bodies by encoding, rendering it once however many requests miss at the same time
+    def get_or_render(self, key, render):
+        with self.lock:
+            page = self.pages.get(key)
+            if page is not None:
+                self.pages.move_to_end(key)
+                metrics.count('response_cache_requests', result='hit')
+                return page
+            flight = self.flights.setdefault(key, threading.Lock())
+        with flight:
+            with self.lock:
+                page = self.pages.get(key)
+            if page is None:
+                metrics.count('response_cache_requests', result='miss')
+                page = encode_bodies(render())
+                with self.lock:
+                    self.pages[key] = page
+                    while len(self.pages) > self.max_entries:
+                        self.pages.popitem(last=False)
+            else:
+                metrics.count('response_cache_requests', result='hit')
+        with self.lock:
+            self.flights.pop(key, None)
+        return page
+
+    # Drop every cached page, e.g. so a benchmark times the render rather than a hit
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
+
+    # Function to answer the current request for a page. key holds everything the body depends on
+    # besides the snapshot; built_at (the snapshot's build time, one per bar close) versions it.
+    def respond(self, key, built_at, render):
+        key = (request.script_root, built_at) + tuple(key)
+        encoding = request.accept_encodings.best_match(available_encodings(), default='identity')
+        etag = key_etag(key) + ('' if encoding == 'identity' else '-' + encoding)
+        # Only the ETag decides: a Last-Modified date is shared by every watchlist built in that snapshot
+        if request.method in ('GET', 'HEAD') and request.if_none_match.contains(etag):
+            metrics.count('response_cache_requests', result='not_modified')
+            return self.headers(Response(status=304), etag, built_at)
+        response = Response(self.get_or_render(key, render)[encoding], mimetype='text/html')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return self.headers(response, etag, built_at)
+
+    # Function to add validators and caching headers; the ETag is per encoding, the bytes differ
+    def headers(self, response, etag, built_at):
+        response.set_etag(etag)
+        response.last_modified = int(built_at)
+        response.vary.add('Accept-Encoding')
+        response.vary.add('Cookie')
+        # Browsers may keep the page but must ask again on every load; unchanged pages cost a 304
+        response.cache_control.no_cache = True
+        response.cache_control.private = True
+        return response
+
+page_cache = ResponseCache()
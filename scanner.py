@@ -0,0 +1,98 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+from fetch_scheduler import FetchRequest, fetch_all
+from signals import match_rules, position_sizing
+
+WATCHLIST_DIR = os.environ.get(
+    'WATCHLIST_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'watchlists'))
+SCAN_COLUMNS = ['Time', 'Close', 'RSI', 'LowerBand', 'UpperBand', 'Signal', 'Distance']
+
+# Function to normalise a symbol to its yfinance form, defaulting to the NSE suffix
+def normalize_symbol(symbol, suffix='.NS'):
+    symbol = symbol.strip().upper()
+    return symbol if not symbol or '.' in symbol or symbol.startswith('^') else symbol + suffix
+
+# Function to parse symbols from text: one per line or comma separated, '#' starts a comment
+def parse_symbols(text):
+    symbols = []
+    for line in text.splitlines():
+        for symbol in line.split('#')[0].split(','):
+            symbol = normalize_symbol(symbol)
+            if symbol and symbol not in symbols:
+                symbols.append(symbol)
+    return symbols
+
+# Function to find a named watchlist ('nifty500', 'nifty500.csv') inside WATCHLIST_DIR
+def watchlist_path(name):
+    name = os.path.basename(name.strip())
+    for candidate in (name, name + '.txt', name + '.csv'):
+        path = os.path.join(WATCHLIST_DIR, candidate)
+        if os.path.isfile(path):
+            return path
+    raise FileNotFoundError(f'No watchlist named {name}')
+
+# Function to read a watchlist: a plain text list, or a CSV with a SYMBOL column (e.g. an NSE index file)
+def load_watchlist(path):
+    with open(path, newline='') as f:
+        if path.lower().endswith('.csv'):
+            rows = csv.DictReader(f)
+            column = next(name for name in rows.fieldnames if name.strip().upper() == 'SYMBOL')
+            return parse_symbols('\n'.join(row[column] for row in rows))
+        return parse_symbols(f.read())
+
+# Function to stack the last `depth` closes of every symbol into one (time x symbol) array.
+# Rows are aligned by bar position from the end, so each column ends at that symbol's latest bar.
+def wide_closes(frames, depth):
+    symbols, columns, times = [], [], []
+    for symbol, frame in frames.items():
+        close = frame['Close'].dropna()
+        if len(close) >= depth:
+            symbols.append(symbol)
+            columns.append(close.to_numpy(dtype=float)[-depth:])
+            times.append(close.index[-1])
+    closes = np.column_stack(columns) if columns else np.empty((depth, 0))
+    return symbols, times, closes
+
+# Function to compute current-bar RSI and Bollinger Bands for every column at once.
+# Same definitions as calculate_rsi / calculate_bollinger_bands, evaluated only at the last row.
+def latest_indicators(closes, rsi_window=23, bb_window=20, num_std_dev=2):
+    delta = np.diff(closes[-(rsi_window + 1):], axis=0)
+    avg_gain = np.where(delta > 0, delta, 0).mean(axis=0)
+    avg_loss = np.where(delta < 0, -delta, 0).mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    window = closes[-bb_window:]
+    sma = window.mean(axis=0)
+    std = window.std(axis=0, ddof=1)
+    return rsi, sma + num_std_dev * std, sma - num_std_dev * std
+
+# Function to evaluate the entry rules on the latest bar of every symbol and keep only the ones
+# that trigger, ranked by how far RSI is past its rule's threshold
+def scan(frames, rules, rsi_window=23, bb_window=20, num_std_dev=2):
+    symbols, times, closes = wide_closes(frames, max(rsi_window + 1, bb_window))
+    rsi, upper_band, lower_band = latest_indicators(closes, rsi_window, bb_window, num_std_dev)
+    close = closes[-1] if len(symbols) else np.empty(0)
+    matched = match_rules({'RSI': rsi, 'Close': close, 'LowerBand': lower_band, 'UpperBand': upper_band}, rules)
+    highlights = np.array([rule.highlight for rule in rules] + [''])
+    thresholds = np.array([rule.rsi_threshold for rule in rules] + [np.nan], dtype=float)
+    result = pd.DataFrame({'Time': times, 'Close': close, 'RSI': rsi, 'LowerBand': lower_band,
+                           'UpperBand': upper_band, 'Signal': highlights[matched],
+                           'Distance': np.abs(rsi - thresholds[matched])},
+                          index=pd.Index(symbols, name='Symbol'), columns=SCAN_COLUMNS)
+    return result[matched >= 0].sort_values('Distance', ascending=False)
+
+# Function to fetch today's 5-minute bars for a watchlist and scan them; symbols that fail to load are skipped
+def scan_watchlist(ticker_symbols, rules):
+    bars = fetch_all([FetchRequest(ticker_symbol, '5m', '1d') for ticker_symbol in ticker_symbols],
+                     raise_errors=False)
+    frames = {request.symbol: data for request, data in bars.items() if data is not None and not data.empty}
+    return scan(frames, rules)
+
+# Function to add SL/Qty/Target columns for the user's capital and risk
+def size_scan(result, user_capital, user_risk, rules):
+    result = result.copy()
+    result['StopLoss'], result['Qty'], result['Target'] = position_sizing(
+        result['Close'].to_numpy(dtype=float), result['Signal'].to_numpy(), user_capital, user_risk, rules)
+    return result
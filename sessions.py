@@ -0,0 +1,55 @@
+import logging
+import os
+import secrets
+import threading
+import time
+from flask import session
+
+# Secret for signing session cookies; set SECRET_KEY so every worker process shares it
+SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
+
+# Function to check the cookie secret before serving. Without SECRET_KEY every worker process signs
+# cookies with its own random key, so a session saved by one worker reads as the defaults in the next:
+# refuse to start with several workers (WEB_CONCURRENCY), warn under gunicorn, which may run several.
+def check_secret_key():
+    if os.environ.get('SECRET_KEY'):
+        return
+    if int(os.environ.get('WEB_CONCURRENCY') or 1) > 1:
+        raise RuntimeError('SECRET_KEY must be set when serving from several worker processes')
+    if os.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'):
+        logging.getLogger(__name__).warning(
+            'SECRET_KEY is not set: sessions only survive while every request reaches the same worker')
+
+# Function to read this browser session's watchlist and capital/risk, falling back to defaults
+def load_settings(defaults):
+    settings = {key: session.get(key, value) for key, value in defaults.items()}
+    settings['ticker_symbols'] = list(settings['ticker_symbols'])
+    return settings
+
+# Function to store this browser session's settings and register its tickers for background refresh
+def save_settings(settings):
+    session.update(settings)
+    watched.touch(settings['ticker_symbols'])
+    return settings
+
+# Symbols any session asked for recently; the background refresh keeps these warm
+class WatchRegistry:
+    def __init__(self, max_age=24 * 60 * 60):
+        self.max_age = max_age
+        self.last_seen = {}
+        self.lock = threading.Lock()
+
+    def touch(self, ticker_symbols):
+        now = time.time()
+        with self.lock:
+            for ticker_symbol in ticker_symbols:
+                self.last_seen[ticker_symbol] = now
+
+    def symbols(self):
+        cutoff = time.time() - self.max_age
+        with self.lock:
+            for ticker_symbol in [symbol for symbol, seen in self.last_seen.items() if seen < cutoff]:
+                del self.last_seen[ticker_symbol]
+            return list(self.last_seen)
+
+watched = WatchRegistry()
@@ -0,0 +1,67 @@
+from collections import namedtuple
+import numpy as np
+
+TARGET_PERCENTAGE = 0.36
+
+# One declarative entry rule. A bar matches when `RSI rsi_op rsi_threshold` holds and so does the band
+# condition ('below_lower': Close < LowerBand, 'above_upper': Close > UpperBand, None: no condition).
+# The first matching rule flags the bar with its highlight class; side 'long' or 'short' also sizes an
+# entry aiming for a target_percentage move, side None only highlights.
+Rule = namedtuple('Rule', ['highlight', 'side', 'rsi_op', 'rsi_threshold', 'band', 'target_percentage'],
+                  defaults=[None, TARGET_PERCENTAGE])
+
+# A named list of rules, e.g. the buy side or the sell side page
+Strategy = namedtuple('Strategy', ['name', 'rules'])
+
+RSI_OPS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+# Function to evaluate a rule's band condition on every bar
+def band_condition(data, band):
+    close = np.asarray(data['Close'])
+    if band is None:
+        return np.ones(len(close), dtype=bool)
+    if band == 'below_lower':
+        return close < np.asarray(data['LowerBand'])
+    if band == 'above_upper':
+        return close > np.asarray(data['UpperBand'])
+    raise ValueError(f'Unknown band condition: {band}')
+
+# Function to give every bar the index of the first rule it matches, -1 when none does.
+# data is a frame or a dict of arrays with RSI, Close and the bands the rules use.
+def match_rules(data, rules):
+    rsi = np.asarray(data['RSI'])
+    matched = np.full(len(rsi), -1)
+    for i, rule in enumerate(rules):
+        hit = (matched < 0) & RSI_OPS[rule.rsi_op](rsi, rule.rsi_threshold) & band_condition(data, rule.band)
+        matched[hit] = i
+    return matched
+
+# Function to flag every bar at once with the highlight class of its first matching rule, '' otherwise
+def evaluate_signals(data, rules):
+    highlights = np.array([rule.highlight for rule in rules] + [''])
+    return highlights[match_rules(data, rules)]
+
+# Function to size positions for flagged bars, long or short as the bar's rule says.
+# Returns (stop_loss, qty, target) arrays, NaN where not sized.
+def position_sizing(close, signal, user_capital, user_risk, rules):
+    step1 = user_capital / close
+    step2 = user_risk / step1
+    qty = user_capital / close
+    stop_loss = np.full(len(close), np.nan)
+    target_price = np.full(len(close), np.nan)
+    sized = np.zeros(len(close), dtype=bool)
+    for rule in rules:
+        if rule.side is None:
+            continue
+        hit = signal == rule.highlight
+        target = (close * rule.target_percentage) / 100
+        if rule.side == 'long':
+            stop_loss = np.where(hit, close - step2, stop_loss)
+            target_price = np.where(hit, target + close, target_price)
+        elif rule.side == 'short':
+            stop_loss = np.where(hit, close + step2, stop_loss)
+            target_price = np.where(hit, close - target, target_price)
+        else:
+            raise ValueError(f'Unknown rule side: {rule.side}')
+        sized |= hit
+    return stop_loss, np.where(sized, qty, np.nan), target_price
@@ -0,0 +1,117 @@
+import json
+import numpy as np
+import pandas as pd
+from flask import Response, request
+from live import parse_after
+from metrics import metrics
+from scanner import parse_symbols
+from signals import position_sizing
+from symbol_master import validate_tickers
+
+# Arrow IPC output is optional; without pyarrow only JSON is served
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+# Per-symbol columns, in order; time is epoch seconds in JSON and a UTC timestamp in Arrow
+API_COLUMNS = ['time', 'close', 'rsi', 'lower_band', 'upper_band', 'signal', 'stop_loss', 'qty', 'target']
+
+# Function to read ?since= as epoch seconds (like the push stream's after=) or an ISO timestamp.
+# 'nan' or 'NaT' parse to NaT, which would filter nothing, so they are rejected like any other bad value.
+def parse_since(value):
+    if not value:
+        return None
+    since = parse_after(value)
+    if since is None:
+        try:
+            since = pd.Timestamp(value)
+        except ValueError:
+            since = None
+    if pd.isna(since):
+        raise ValueError(f'Invalid since: {value}')
+    return since
+
+# Function to take one symbol's bars at or after `since` as the API's columns. SL/Qty/Target come from
+# the same position sizing as the page, NaN where a bar is not sized.
+def symbol_columns(bars, user_capital, user_risk, rules, since=None):
+    start = 0
+    if since is not None:
+        if since.tz is None and bars.tz is not None:
+            since = since.tz_localize(bars.tz)
+        start = int(np.searchsorted(bars.times, since.as_unit('ns').value))
+    close = bars['Close'][start:].astype(float)
+    signal = bars['Signal'][start:]
+    stop_loss, qty, target = position_sizing(close, signal, user_capital, user_risk, rules)
+    return {'time': bars.times[start:] // 10 ** 9, 'close': close, 'rsi': bars['RSI'][start:].astype(float),
+            'lower_band': bars['LowerBand'][start:].astype(float), 'upper_band': bars['UpperBand'][start:].astype(float),
+            'signal': signal, 'stop_loss': stop_loss, 'qty': qty, 'target': target}
+
+# Function to compute the API columns of every symbol from a strategy's snapshot
+def signal_columns(snapshot, ticker_symbols, user_capital, user_risk, rules, since=None):
+    return {ticker_symbol: symbol_columns(snapshot.data_5min_all[ticker_symbol], user_capital, user_risk, rules, since)
+            for ticker_symbol in ticker_symbols}
+
+# Function to turn a float column into a JSON list, NaN as null
+def json_column(values):
+    if values.dtype.kind != 'f':
+        return values.tolist()
+    return [None if value != value else value for value in values.tolist()]
+
+# Function to encode the columns as JSON: one object of equal-length arrays per symbol
+def columns_json(columns, meta):
+    body = dict(meta, columns=API_COLUMNS,
+                symbols={ticker_symbol: {name: json_column(values) for name, values in symbol.items()}
+                         for ticker_symbol, symbol in columns.items()})
+    return json.dumps(body, separators=(',', ':'))
+
+# Function to encode the columns as one Arrow IPC stream: a long table with a dictionary-encoded
+# symbol column, metadata in the schema
+def columns_arrow(columns, meta):
+    lengths = [len(symbol['time']) for symbol in columns.values()]
+    table = {'symbol': pyarrow.array(np.repeat(list(columns), lengths).tolist(), pyarrow.string()).dictionary_encode()}
+    for name in API_COLUMNS:
+        values = np.concatenate([symbol[name] for symbol in columns.values()]) if columns else np.empty(0)
+        if name == 'time':
+            table[name] = pyarrow.array(values.astype('int64') * 10 ** 9, pyarrow.timestamp('ns', tz='UTC'))
+        elif name == 'signal':
+            table[name] = pyarrow.array(values.astype(str).tolist(), pyarrow.string()).dictionary_encode()
+        else:
+            table[name] = pyarrow.array(values.astype(float), pyarrow.float64())
+    table = pyarrow.table(table).replace_schema_metadata({key: str(value) for key, value in meta.items()})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+# Function to answer /api/signals for one strategy. Tickers, capital and risk default to the browser
+# session's; ?since= returns only bars at or after it (the last bar may still be forming, so pulls
+# should repeat from the last time they saw); ?format=arrow or an Arrow Accept header asks for Arrow.
+def signals_response(snapshots, build_snapshot, strategy, settings):
+    try:
+        ticker_symbols = parse_symbols(request.args['tickers']) if request.args.get('tickers') \
+            else settings['ticker_symbols']
+        user_capital = float(request.args.get('capital', settings['user_capital']))
+        user_risk = float(request.args.get('risk', settings['user_risk']))
+        since = parse_since(request.args.get('since'))
+    except ValueError as error:
+        return Response(json.dumps({'error': str(error)}), status=400, mimetype='application/json')
+    invalid = [t for t, valid in validate_tickers(ticker_symbols).items() if not valid]
+    if invalid:
+        return Response(json.dumps({'error': f'Invalid ticker symbols: {", ".join(invalid)}'}), status=400,
+                        mimetype='application/json')
+
+    arrow = request.args.get('format') == 'arrow' or \
+        request.accept_mimetypes.best_match(['application/json', ARROW_MIMETYPE]) == ARROW_MIMETYPE
+    if arrow and pyarrow is None:
+        return Response(json.dumps({'error': 'Arrow output needs pyarrow installed'}), status=406,
+                        mimetype='application/json')
+
+    snapshot = snapshots.get_or_build(ticker_symbols, build_snapshot)
+    columns = signal_columns(snapshot, ticker_symbols, user_capital, user_risk, strategy.rules, since)
+    meta = {'strategy': strategy.name, 'built_at': snapshot.built_at, 'capital': user_capital, 'risk': user_risk}
+    with metrics.timer('serialize', format='arrow' if arrow else 'json'):
+        if arrow:
+            return Response(columns_arrow(columns, meta), mimetype=ARROW_MIMETYPE)
+        return Response(columns_json(columns, meta), mimetype='application/json')
@@ -0,0 +1,100 @@
+import os
+import pickle
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from metrics import metrics
+
+# Immutable result of one refresh: per-symbol 5-minute frames (indicators + Signal) and RSI levels.
+# Everything that depends on the user's capital/risk is computed per request on top of it.
+Snapshot = namedtuple('Snapshot', ['built_at', 'ticker_symbols', 'data_5min_all', 'rsi_levels'])
+
+# Last market snapshot saved to disk, so a restarted app can serve pages before its first download
+SNAPSHOT_CACHE_PATH = os.environ.get(
+    'SNAPSHOT_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'snapshot.pickle'))
+# A saved snapshot older than this is not worth showing (seconds)
+WARM_MAX_AGE = 24 * 60 * 60
+
+# Function to freeze freshly computed data into a Snapshot
+def make_snapshot(ticker_symbols, data_5min_all, rsi_levels):
+    return Snapshot(time.time(), tuple(ticker_symbols),
+                    MappingProxyType(dict(data_5min_all)), MappingProxyType(dict(rsi_levels)))
+
+# Function to combine two snapshots into a new one; symbols in extra win
+def merge_snapshots(base, extra):
+    if base is None:
+        return extra
+    ticker_symbols = base.ticker_symbols + tuple(t for t in extra.ticker_symbols if t not in base.data_5min_all)
+    return Snapshot(min(base.built_at, extra.built_at), ticker_symbols,
+                    MappingProxyType({**base.data_5min_all, **extra.data_5min_all}),
+                    MappingProxyType({**base.rsi_levels, **extra.rsi_levels}))
+
+# Function to narrow a snapshot down to some of its symbols
+def select_snapshot(snapshot, ticker_symbols):
+    return Snapshot(snapshot.built_at, tuple(ticker_symbols),
+                    MappingProxyType({t: snapshot.data_5min_all[t] for t in ticker_symbols}),
+                    MappingProxyType({t: snapshot.rsi_levels[t] for t in ticker_symbols}))
+
+# Function to save a snapshot to disk; written to a temporary file first so readers never see half of it
+def save_snapshot(snapshot, path=SNAPSHOT_CACHE_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as f:
+        pickle.dump((snapshot.built_at, snapshot.ticker_symbols, dict(snapshot.data_5min_all),
+                     dict(snapshot.rsi_levels)), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)
+
+# Function to load the snapshot save_snapshot wrote; None when there is none, it is unreadable or too old.
+# The file is only ever written by this app (pickle must not be fed untrusted files).
+def load_snapshot(path=SNAPSHOT_CACHE_PATH, max_age=WARM_MAX_AGE):
+    try:
+        with open(path, 'rb') as f:
+            built_at, ticker_symbols, data_5min_all, rsi_levels = pickle.load(f)
+    except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+        return None
+    if time.time() - built_at > max_age:
+        return None
+    return Snapshot(built_at, tuple(ticker_symbols), MappingProxyType(data_5min_all), MappingProxyType(rsi_levels))
+
+# Function to give the age of a snapshot in whole seconds
+def snapshot_age(snapshot):
+    return int(time.time() - snapshot.built_at)
+
+# Holds the current snapshot of every watched symbol; readers take a reference,
+# writers swap in a complete new one (copy-on-write)
+class SnapshotHolder:
+    def __init__(self, name=''):
+        self.name = name
+        self.current = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        return self.current
+
+    def swap(self, snapshot):
+        with self.lock:
+            if self.current is None or snapshot.built_at >= self.current.built_at:
+                self.current = snapshot
+        return snapshot
+
+    # Return a snapshot covering these tickers, building any missing ones synchronously
+    def get_or_build(self, ticker_symbols, build):
+        snapshot = self.current
+        missing = [t for t in ticker_symbols if snapshot is None or t not in snapshot.data_5min_all]
+        metrics.count('snapshot_requests', holder=self.name, result='miss' if missing else 'hit')
+        if missing:
+            built = build(missing)
+            with self.lock:
+                self.current = snapshot = merge_snapshots(self.current, built)
+        return snapshot
+
+# Function to run job just after every 5-minute bar close (hh:00:05, hh:05:05, ...)
+def start_refresh_scheduler(job, delay_seconds=5):
+    from apscheduler.schedulers.background import BackgroundScheduler
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(func=job, trigger='cron', minute='*/5', second=delay_seconds,
+                      max_instances=1, coalesce=True)
+    scheduler.start()
+    return scheduler
@@ -0,0 +1,106 @@
+import time
+from flask import Flask, render_template, request
+from live import rows_response, stream_response
+from metrics import metrics
+from page import page_context, render_page
+from response_cache import page_cache
+from scanner import load_watchlist, parse_symbols, scan_watchlist, size_scan, watchlist_path
+from sessions import SECRET_KEY, check_secret_key, load_settings, watched
+from signals_api import signals_response
+from strategy_engine import engine
+
+# Function to build one strategy's pages as a Flask app: the RSI page, its push stream and earlier rows,
+# the signals API and the scanner, all the same for every strategy. Only the page's form differs:
+# read_form(settings) applies a POST and returns (settings, error_message).
+def strategy_app(import_name, strategy, page, default_settings, read_form):
+    app = Flask(import_name)
+    app.secret_key = SECRET_KEY
+    # Own cookie name so several strategies' pages can share one host (see entry_app.py)
+    app.config['SESSION_COOKIE_NAME'] = f'{strategy.name}_session'
+    # /metrics (Prometheus text) and a Server-Timing header on every response
+    metrics.install(app)
+    watched.touch(default_settings['ticker_symbols'])
+
+    # This page's market data view, shared with any other strategy served from the same process
+    snapshots, updates = engine.register(strategy, default_settings['ticker_symbols'])
+
+    def build_snapshot(ticker_symbols):
+        return engine.build(strategy, ticker_symbols)
+
+    # Route for the page: this session's RSI table, sized for its capital and risk
+    @app.route('/', methods=['GET', 'POST'])
+    def index():
+        settings = load_settings(default_settings)
+        error_message = ''
+        if request.method == 'POST':
+            settings, error_message = read_form(settings)
+        # Every page load keeps this session's tickers in the background refresh
+        watched.touch(settings['ticker_symbols'])
+
+        # Rendered once per snapshot for these inputs; repeat loads are served from memory or answered with 304
+        snapshot = snapshots.get_or_build(settings['ticker_symbols'], build_snapshot)
+        return page_cache.respond((strategy.name, tuple(settings['ticker_symbols']), settings['user_capital'],
+                                   settings['user_risk'], error_message), snapshot.built_at,
+                                  lambda: render_page(page_context(snapshot, page, strategy.rules,
+                                                                   settings['ticker_symbols'], settings['user_capital'],
+                                                                   settings['user_risk'], error_message)))
+
+    # Route for live updates: Server-Sent Events carrying only new or changed rows of this session's table
+    @app.route('/stream')
+    def stream():
+        settings = load_settings(default_settings)
+        # An open stream keeps its tickers in the background refresh
+        watched.touch(settings['ticker_symbols'])
+        snapshots.get_or_build(settings['ticker_symbols'], build_snapshot)
+        return stream_response(updates, snapshots, settings['ticker_symbols'], settings['user_capital'],
+                               settings['user_risk'], strategy.rules,
+                               request.headers.get('Last-Event-ID') or request.args.get('after'))
+
+    # Route for the table's earlier rows: the page carries only the latest window and fetches the
+    # `limit` rows before `before` (epoch seconds) as the user scrolls back
+    @app.route('/rows')
+    def rows():
+        settings = load_settings(default_settings)
+        snapshot = snapshots.get_or_build(settings['ticker_symbols'], build_snapshot)
+        return rows_response(snapshot, settings['ticker_symbols'], settings['user_capital'], settings['user_risk'],
+                             strategy.rules, request.args.get('before'), request.args.get('limit'))
+
+    # Route for order-staging tools: the page's RSI, bands, signals and SL/Qty/Target as columns
+    # (JSON, or Arrow IPC with format=arrow), optionally only bars since a time
+    @app.route('/api/signals')
+    def api_signals():
+        return signals_response(snapshots, build_snapshot, strategy, load_settings(default_settings))
+
+    # Route for the watchlist scanner: only symbols whose latest bar triggers, strongest first
+    @app.route('/scan', methods=['GET', 'POST'])
+    def scan_page():
+        settings = load_settings(default_settings)
+        watchlist = request.values.get('watchlist', '').strip()
+        error_message = ''
+        ticker_symbols = settings['ticker_symbols']
+        if request.form.get('symbols', '').strip():
+            ticker_symbols = parse_symbols(request.form['symbols'])
+        elif watchlist:
+            try:
+                ticker_symbols = load_watchlist(watchlist_path(watchlist))
+            except (OSError, StopIteration):
+                error_message = f'Could not read watchlist: {watchlist}'
+
+        start = time.perf_counter()
+        results = size_scan(scan_watchlist(ticker_symbols, strategy.rules),
+                            settings['user_capital'], settings['user_risk'], strategy.rules)
+        return render_template('scan.html', page=page, watchlist=watchlist, error_message=error_message,
+                               results=results.reset_index().to_dict('records'), scanned=len(ticker_symbols),
+                               elapsed=time.perf_counter() - start)
+
+    return app
+
+# Function to give a page module its create_app: check the cookie secret suits the server, then start
+# serving the page by warm-loading the last saved snapshot and starting the background refresh.
+# Importing the module only defines the app; nothing runs until create_app is called.
+def app_factory(app):
+    def create_app(warm=True):
+        check_secret_key()
+        engine.startup(warm)
+        return app
+    return create_app
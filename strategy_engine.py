@@ -0,0 +1,160 @@
+import threading
+from types import MappingProxyType
+from alerts import AlertDispatcher, AlertEngine, default_sinks
+from bar_cache import get_bars
+from bar_store import CompactBars
+from fetch_scheduler import INTRADAY_PERIOD, daily_request, fetch_all, intraday_request, page_requests
+from indicators import calculate_5min_rsi_bollinger, calculate_rsi_levels, update_indicators
+from metrics import metrics
+from live import Broadcaster, bar_update
+from mtf_rsi import TIMEFRAMES, batch_rsi_levels
+from resample import derived_bars, timeframe_closes
+from sessions import watched
+from signals import evaluate_signals
+from snapshot import (SNAPSHOT_CACHE_PATH, Snapshot, SnapshotHolder, load_snapshot, make_snapshot, save_snapshot,
+                      select_snapshot, snapshot_age, start_refresh_scheduler)
+
+# Function to fetch 5-minute data and calculate RSI and Bollinger Bands
+def fetch_5min_rsi_bollinger(ticker_symbol, period=INTRADAY_PERIOD):
+    return calculate_5min_rsi_bollinger(get_bars(ticker_symbol, '5m', period))
+
+# Function to fetch daily, weekly, and monthly RSI
+def fetch_rsi_levels(ticker_symbol):
+    daily_data = get_bars(ticker_symbol, '1d', 'max')
+    return calculate_rsi_levels(daily_data, derived_bars(ticker_symbol, daily_data, 'week'),
+                                derived_bars(ticker_symbol, daily_data, 'month'))
+
+# Function to download and compute everything that depends on neither the strategy nor capital/risk.
+# 5-minute bars are kept as compact columnar bars (see bar_store), not DataFrames. With previous (the
+# refresh), a symbol whose download failed keeps its previous bars instead of failing every symbol.
+def build_market(ticker_symbols, previous=None):
+    data_5min_all = {}
+    rsi_levels = {}
+
+    # Download every (symbol, interval) series concurrently before computing anything
+    with metrics.timer('download'):
+        bars = fetch_all([request for ticker_symbol in ticker_symbols for request in page_requests(ticker_symbol)],
+                         raise_errors=previous is None)
+    for request in [request for request, data in bars.items() if data is None]:
+        metrics.count('market_fetch_errors', interval=request.interval)
+    failed = {t for t in ticker_symbols if any(bars[request] is None for request in page_requests(t))}
+    fetched = [t for t in ticker_symbols if t not in failed]
+
+    # Daily, weekly and monthly RSI for all tickers in one batch; weeks and months come from the daily bars
+    with metrics.timer('levels'):
+        levels = batch_rsi_levels({ticker_symbol: timeframe_closes(ticker_symbol, bars[daily_request(ticker_symbol)])
+                                   for ticker_symbol in fetched})
+
+    with metrics.timer('indicators'):
+        for ticker_symbol in fetched:
+            data_5min = update_indicators(ticker_symbol, bars[intraday_request(ticker_symbol)])
+            data_5min_all[ticker_symbol] = CompactBars.from_frame(data_5min.dropna(subset=['RSI', 'LowerBand']))
+            rsi_levels[ticker_symbol] = tuple(levels.loc[ticker_symbol, TIMEFRAMES])
+    for ticker_symbol in failed:
+        if previous is not None and ticker_symbol in previous.data_5min_all:
+            data_5min_all[ticker_symbol] = previous.data_5min_all[ticker_symbol]
+            rsi_levels[ticker_symbol] = previous.rsi_levels[ticker_symbol]
+    return make_snapshot([t for t in ticker_symbols if t in data_5min_all], data_5min_all, rsi_levels)
+
+# Function to derive a strategy's snapshot from market data by flagging its rules' signals;
+# the compact bars' arrays are shared with the market snapshot, only the signal codes are new
+def strategy_snapshot(market, strategy):
+    with metrics.timer('signals'):
+        return Snapshot(market.built_at, market.ticker_symbols,
+                        MappingProxyType({ticker_symbol: data.with_signal(evaluate_signals(data, strategy.rules))
+                                          for ticker_symbol, data in market.data_5min_all.items()}),
+                        market.rsi_levels)
+
+# Market data shared by every registered strategy: each symbol is fetched and its indicators computed
+# once per refresh however many strategies watch it, and each strategy only adds its own signals
+class StrategyEngine:
+    def __init__(self):
+        self.market = SnapshotHolder('market')
+        self.strategies = {}
+        self.snapshots = {}
+        self.updates = {}
+        self.default_symbols = []
+        self.scheduler = None
+        self.started = False
+        self.snapshot_path = SNAPSHOT_CACHE_PATH
+        self.alerts = AlertEngine(AlertDispatcher(default_sinks()))
+        self.lock = threading.Lock()
+        metrics.gauge('snapshot_age_seconds', 'Seconds since each snapshot was built', self.snapshot_ages)
+        metrics.gauge('stream_clients', 'Open live-update streams per strategy', self.stream_clients)
+
+    # Register a strategy; returns its snapshot holder and its push broadcaster
+    def register(self, strategy, default_symbols=()):
+        with self.lock:
+            if strategy.name not in self.strategies:
+                self.snapshots[strategy.name] = SnapshotHolder(strategy.name)
+                self.updates[strategy.name] = Broadcaster()
+            self.strategies[strategy.name] = strategy
+            self.default_symbols += [t for t in default_symbols if t not in self.default_symbols]
+        return self.snapshots[strategy.name], self.updates[strategy.name]
+
+    # Build a strategy's snapshot for these tickers, reusing market data another strategy already loaded
+    def build(self, strategy, ticker_symbols):
+        market = self.market.get_or_build(ticker_symbols, build_market)
+        return strategy_snapshot(select_snapshot(market, ticker_symbols), strategy)
+
+    # Rebuild market data for every watched ticker once, then swap in and push each strategy's view
+    # and queue alerts for setups the new bars triggered. Tickers that fail to download keep their last
+    # bars rather than holding back everyone else's. The market snapshot is also saved for warm starts.
+    def refresh(self):
+        market = self.market.swap(build_market(watched.symbols() or self.default_symbols, self.market.get()))
+        try:
+            save_snapshot(market, self.snapshot_path)
+        except OSError:
+            metrics.count('snapshot_saves', result='error')
+        with self.lock:
+            strategies = list(self.strategies.values())
+        for strategy in strategies:
+            snapshots = self.snapshots[strategy.name]
+            previous = snapshots.get()
+            snapshot = snapshots.swap(strategy_snapshot(market, strategy))
+            self.updates[strategy.name].publish(bar_update(previous, snapshot))
+        self.alerts.evaluate(market, strategies)
+
+    # Ages of the market snapshot and every strategy's, for the metrics gauge
+    def snapshot_ages(self):
+        holders = [('market', self.market)] + list(self.snapshots.items())
+        return {(('snapshot', name),): snapshot_age(holder.get()) for name, holder in holders
+                if holder.get() is not None}
+
+    def stream_clients(self):
+        return {(('strategy', name),): broadcaster.client_count() for name, broadcaster in list(self.updates.items())}
+
+    # Serve the last saved market snapshot until the first refresh lands: pages render at once, showing
+    # its age, while fresh bars download in the background. Returns the snapshot, None if there was none.
+    def warm_start(self):
+        market = load_snapshot(self.snapshot_path)
+        if market is None:
+            return None
+        self.market.swap(market)
+        watched.touch(market.ticker_symbols)
+        with self.lock:
+            strategies = list(self.strategies.values())
+        for strategy in strategies:
+            self.snapshots[strategy.name].swap(strategy_snapshot(market, strategy))
+        return market
+
+    # Bring the engine up for serving, once however many apps call it: warm-load the saved snapshot,
+    # refresh in the background right away, then after every bar close
+    def startup(self, warm=True):
+        with self.lock:
+            if self.started:
+                return self.scheduler
+            self.started = True
+        if warm:
+            self.warm_start()
+        threading.Thread(target=self.refresh, name='first-refresh', daemon=True).start()
+        return self.start()
+
+    # Start the refresh after every 5-minute bar close; one scheduler however many apps share the engine
+    def start(self):
+        with self.lock:
+            if self.scheduler is None:
+                self.scheduler = start_refresh_scheduler(self.refresh)
+            return self.scheduler
+
+engine = StrategyEngine()
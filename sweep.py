@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import os
+from itertools import product
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from backtest import session_bounds, simulate_exits
+from fetch_scheduler import FetchRequest, fetch_all
+from mtf_rsi import get_pool
+from scanner import load_watchlist, watchlist_path
+from signals import match_rules, position_sizing
+
+RESULT_COLUMNS = ['RSIWindow', 'BBWindow', 'NumStdDev', 'LowRSI', 'HighRSI', 'TargetPercentage',
+                  'Trades', 'Targets', 'HitRate', 'PnL', 'MaxDrawdown']
+# Thresholds are (first rule, second rule) pairs, e.g. (low RSI, high RSI) for the buy and sell pages
+DEFAULT_GRID = {
+    'rsi_window': [14, 18, 23, 28],
+    'bb_window': [15, 20, 25],
+    'num_std_dev': [1.5, 2, 2.5],
+    'thresholds': [(20, 60), (30, 70), (45, 85)],
+    'target_percentage': [0.24, 0.36, 0.5],
+}
+# Entries whose exits are simulated per matrix, bounding memory at about 75 bars ahead each
+EXIT_CHUNK = 50000
+
+# Function to compute running sums that a rolling mean over any window is read from
+def prefix_sums(values):
+    return np.concatenate([[0.0], np.cumsum(values)])
+
+# Function to read rolling means for one window from prefix sums, NaN until the session has `window` bars
+def window_mean(sums, starts, window):
+    positions = np.arange(len(sums) - 1)
+    first = positions - window + 1
+    mean = (sums[positions + 1] - sums[np.maximum(first, 0)]) / window
+    return np.where(first >= starts, mean, np.nan)
+
+# Function to compute RSI for one window from the shared gain/loss prefix sums (same definition as the page)
+def sweep_rsi(arrays, window):
+    avg_gain = window_mean(arrays['gain_sums'], arrays['starts'], window)
+    avg_loss = window_mean(arrays['loss_sums'], arrays['starts'], window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+# Function to compute SMA and sample std for one window from the shared prefix sums. Closes are taken
+# relative to their session's first close so the sums of squares stay small and precise.
+def sweep_bands(arrays, window):
+    mean = window_mean(arrays['shifted_sums'], arrays['starts'], window)
+    mean_square = window_mean(arrays['square_sums'], arrays['starts'], window)
+    variance = np.maximum(mean_square - mean * mean, 0.0) * window / (window - 1)
+    return mean + arrays['session_open'], np.sqrt(variance)
+
+# Function to precompute what trading every bar would return for one sized rule and target %.
+# Stop-loss and target only depend on the bar's close, so the path scan is shared by every grid point.
+def exit_outcomes(open_, high, low, close, ends, rule, user_capital, user_risk):
+    eligible = np.flatnonzero(np.arange(len(close)) + 1 < ends)
+    stop_loss, qty, target = position_sizing(close, np.full(len(close), rule.highlight), user_capital, user_risk,
+                                             (rule,))
+    pnl = np.full(len(close), np.nan)
+    hit = np.zeros(len(close), dtype=bool)
+    is_long = rule.side == 'long'
+    for chunk in np.array_split(eligible, max(1, -(-len(eligible) // EXIT_CHUNK))):
+        exit_at, exit_price, outcome = simulate_exits(open_, high, low, close, ends, chunk,
+                                                      np.full(len(chunk), is_long), stop_loss[chunk], target[chunk])
+        pnl[chunk] = (1.0 if is_long else -1.0) * qty[chunk] * (exit_price - close[chunk])
+        hit[chunk] = outcome == 'Target'
+    return pnl, hit
+
+# Function to stack cached history and compute everything the grid points share: session bounds,
+# prefix sums for the rolling windows and per-bar trade outcomes for every sized rule and target %
+def prepare_sweep(frames, rules, user_capital, user_risk, target_percentages):
+    frames = {symbol: data for symbol, data in frames.items() if len(data)}
+    stacked = pd.concat(frames.values())
+    symbol_ids = np.repeat(np.arange(len(frames)), [len(data) for data in frames.values()])
+    open_, high, low, close = (stacked[column].to_numpy(dtype=float) for column in ('Open', 'High', 'Low', 'Close'))
+    starts, ends = session_bounds(stacked.index, symbol_ids)
+    delta = np.diff(close, prepend=close[:1])
+    delta[starts == np.arange(len(close))] = 0.0
+    shifted = close - close[starts]
+    arrays = {'close': close, 'starts': starts, 'symbol_ids': symbol_ids,
+              'tradable': np.arange(len(close)) + 1 < ends, 'session_open': close[starts],
+              'gain_sums': prefix_sums(np.where(delta > 0, delta, 0.0)),
+              'loss_sums': prefix_sums(np.where(delta < 0, -delta, 0.0)),
+              'shifted_sums': prefix_sums(shifted), 'square_sums': prefix_sums(shifted * shifted)}
+    for r, rule in enumerate(rules):
+        if rule.side is None:
+            continue
+        for t, target_percentage in enumerate(target_percentages):
+            arrays[f'pnl_{r}_{t}'], arrays[f'hit_{r}_{t}'] = exit_outcomes(
+                open_, high, low, close, ends, rule._replace(target_percentage=target_percentage),
+                user_capital, user_risk)
+    return arrays
+
+# Function to score one (RSI window, BB window) slice of the grid; the rolling windows are read from
+# the shared sums once and every std multiplier, threshold pair and target % reuses them
+def sweep_tasks(arrays, tasks, rules, grid):
+    rows = []
+    sized = [r for r, rule in enumerate(rules) if rule.side is not None]
+    for rsi_window, bb_window in tasks:
+        rsi = sweep_rsi(arrays, rsi_window)
+        sma, std = sweep_bands(arrays, bb_window)
+        for num_std_dev in grid['num_std_dev']:
+            data = {'RSI': rsi, 'Close': arrays['close'],
+                    'UpperBand': sma + num_std_dev * std, 'LowerBand': sma - num_std_dev * std}
+            for thresholds in grid['thresholds']:
+                matched = match_rules(data, tuple(rule._replace(rsi_threshold=threshold)
+                                                  for rule, threshold in zip(rules, thresholds)))
+                entries = [np.flatnonzero((matched == r) & arrays['tradable']) for r in sized]
+                positions = np.concatenate(entries) if entries else np.empty(0, dtype=int)
+                order = np.argsort(positions, kind='stable')
+                for t, target_percentage in enumerate(grid['target_percentage']):
+                    pnl = np.concatenate([arrays[f'pnl_{r}_{t}'][e] for r, e in zip(sized, entries)] or [[]])[order]
+                    hits = int(sum(arrays[f'hit_{r}_{t}'][e].sum() for r, e in zip(sized, entries)))
+                    rows.append((rsi_window, bb_window, num_std_dev, thresholds[0], thresholds[-1], target_percentage,
+                                 len(pnl), hits, hits / len(pnl) if len(pnl) else np.nan, pnl.sum(),
+                                 max_drawdown(pnl, arrays['symbol_ids'][positions[order]])))
+    return rows
+
+# Function to give the worst per-symbol peak-to-trough fall of cumulative P&L, trades in bar order
+def max_drawdown(pnl, symbol_ids):
+    if not len(pnl):
+        return 0.0
+    equity = pd.Series(pnl).groupby(symbol_ids).cumsum()
+    peak = equity.groupby(symbol_ids).cummax().clip(lower=0)
+    return float((peak - equity).max())
+
+# Function to lay named arrays out in one shared-memory block
+def share_arrays(arrays):
+    layout, size = {}, 0
+    for name, array in arrays.items():
+        layout[name] = (size, array.shape, array.dtype.str)
+        size += -(-array.nbytes // 8) * 8
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, (offset, shape, dtype) in layout.items():
+        np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)[...] = arrays[name]
+    return block, layout
+
+# Worker: attach to the shared arrays by name and score its part of the grid
+def _sweep_worker(block_name, layout, tasks, rules, grid):
+    block = shared_memory.SharedMemory(name=block_name)
+    arrays = None
+    try:
+        arrays = {name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+                  for name, (offset, shape, dtype) in layout.items()}
+        return sweep_tasks(arrays, tasks, rules, grid)
+    finally:
+        # Views must be released before the block closes, or close() raises BufferError over the real error
+        del arrays
+        block.close()
+
+# Function to backtest every point of a parameter grid over cached history and rank the results.
+# rules is a strategy's rule tuple; grid thresholds are applied to its rules in order.
+def run_sweep(frames, rules, user_capital, user_risk, grid=None, workers=None):
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    # No history (an empty watchlist or every download failed): nothing to rank
+    if not any(len(data) for data in frames.values()):
+        return pd.DataFrame(columns=RESULT_COLUMNS, index=pd.RangeIndex(1, 1, name='Rank'))
+    arrays = prepare_sweep(frames, rules, user_capital, user_risk, grid['target_percentage'])
+    tasks = list(product(grid['rsi_window'], grid['bb_window']))
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        rows = sweep_tasks(arrays, tasks, rules, grid)
+    else:
+        block, layout = share_arrays(arrays)
+        try:
+            # One chunk of grid points per worker on the shared, fixed-size pool
+            futures = [get_pool().submit(_sweep_worker, block.name, layout, chunk, rules, grid)
+                       for chunk in (tasks[i * len(tasks) // workers:(i + 1) * len(tasks) // workers]
+                                     for i in range(workers))]
+            rows = [row for future in futures for row in future.result()]
+        finally:
+            block.close()
+            block.unlink()
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS).sort_values(['PnL', 'HitRate'], ascending=False)
+    results.index = pd.RangeIndex(1, len(results) + 1, name='Rank')
+    return results
+
+# Function to sweep a grid over symbols' cached 5-minute history
+def sweep_symbols(ticker_symbols, rules, user_capital, user_risk, grid=None, period='60d', workers=None):
+    bars = fetch_all([FetchRequest(ticker_symbol, '5m', period) for ticker_symbol in ticker_symbols],
+                     raise_errors=False)
+    frames = {request.symbol: data for request, data in bars.items() if data is not None and not data.empty}
+    return run_sweep(frames, rules, user_capital, user_risk, grid, workers)
+
+# Weekly re-tune: python sweep.py nifty500 --page sell --output sweeps/nifty500_sell.csv
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rank indicator and threshold settings over cached history')
+    parser.add_argument('watchlist')
+    parser.add_argument('--page', choices=['buy', 'sell'], default='buy')
+    parser.add_argument('--capital', type=float, default=2000000)
+    parser.add_argument('--risk', type=float, default=7000)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default='sweep_results.csv')
+    args = parser.parse_args()
+    strategy = importlib.import_module(f'{args.page}_entry').STRATEGY
+    results = sweep_symbols(load_watchlist(watchlist_path(args.watchlist)), strategy.rules, args.capital, args.risk,
+                            workers=args.workers)
+    results.to_csv(args.output)
+    print(results.head(20).to_string())
@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from fetch_scheduler import daily_request, fetch_all
+from scanner import WATCHLIST_DIR, load_watchlist
+
+# Local instrument list, e.g. NSE's EQUITY_L.csv (SYMBOL column) or a plain text list of symbols
+SYMBOL_MASTER_PATH = os.environ.get('SYMBOL_MASTER_PATH', os.path.join(WATCHLIST_DIR, 'EQUITY_L.csv'))
+# How long a network check is trusted: listings rarely disappear, typos may be listed later
+VALID_TTL = 24 * 60 * 60
+INVALID_TTL = 15 * 60
+
+# Validates ticker symbols against the symbol master first, then with one batched download for the rest.
+# Results are cached with a TTL, and the download is the data layer's own daily request, so a freshly
+# validated symbol's bars are already in the bar cache when its page is built.
+class SymbolValidator:
+    def __init__(self, master_path=SYMBOL_MASTER_PATH, valid_ttl=VALID_TTL, invalid_ttl=INVALID_TTL, fetch=None):
+        self.master_path = master_path
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self.fetch = fetch or (lambda requests: fetch_all(requests, raise_errors=False))
+        self.master = frozenset()
+        self.master_mtime = None
+        self.results = {}
+        self.lock = threading.Lock()
+
+    # Load the symbol master into memory, again whenever the file changes
+    def known_symbols(self):
+        try:
+            mtime = os.path.getmtime(self.master_path)
+        except OSError:
+            return self.master
+        if mtime != self.master_mtime:
+            try:
+                master = frozenset(load_watchlist(self.master_path))
+            except (OSError, StopIteration):
+                return self.master
+            with self.lock:
+                self.master, self.master_mtime = master, mtime
+        return self.master
+
+    def validate(self, ticker_symbols):
+        now = time.time()
+        known = self.known_symbols()
+        valid, unknown = {}, []
+        with self.lock:
+            for ticker_symbol in ticker_symbols:
+                cached = self.results.get(ticker_symbol)
+                if ticker_symbol in known:
+                    valid[ticker_symbol] = True
+                elif cached is not None and cached[1] > now:
+                    valid[ticker_symbol] = cached[0]
+                elif ticker_symbol not in unknown:
+                    unknown.append(ticker_symbol)
+        if unknown:
+            bars = self.fetch([daily_request(ticker_symbol) for ticker_symbol in unknown])
+            with self.lock:
+                for ticker_symbol in unknown:
+                    data = bars[daily_request(ticker_symbol)]
+                    valid[ticker_symbol] = data is not None and not data.empty
+                    # A failed download says nothing about the symbol, so only real answers are cached
+                    if data is not None:
+                        ttl = self.valid_ttl if valid[ticker_symbol] else self.invalid_ttl
+                        self.results[ticker_symbol] = (valid[ticker_symbol], now + ttl)
+        return valid
+
+validator = SymbolValidator()
+
+# Function to validate several ticker symbols, downloading only the ones nothing vouches for yet
+def validate_tickers(ticker_symbols):
+    return validator.validate(ticker_symbols)